@@ -4,23 +4,34 @@
 from __future__ import annotations
 
 import argparse
+import itertools
+import os
 import shutil
 import subprocess
 import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
 try:
     from pillow_heif import register_heif_opener  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     register_heif_opener = None
 
+try:
+    import pyvips  # type: ignore
+except (ImportError, OSError):  # pragma: no cover - optional dependency; OSError if libvips is missing
+    pyvips = None
+
 try:
     from PIL import Image  # type: ignore
 except ImportError:  # pragma: no cover - Pillow is optional but recommended
     Image = None  # type: ignore
 
-HEIC_EXTENSIONS = {".heic", ".heif"}
+HEIC_EXTENSIONS = frozenset({".heic", ".heif"})
+MOGRIFY_BATCH_SIZE = 64
 
 
 class ConversionError(RuntimeError):
@@ -51,6 +62,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Remove the source HEIC file after successful conversion.",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-convert files even when the destination is already newer than the source.",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -67,62 +83,172 @@ def main() -> None:
     if not source_dir.is_dir():
         raise SystemExit(f"Source path {source_dir} is not a directory")
 
-    heic_files = list(find_heic_files(source_dir))
-    if not heic_files:
+    candidates = iter(find_heic_files(source_dir))
+    first = next(candidates, None)
+    if first is None:
         print("No HEIC/HEIF files found.")
         return
 
-    pillow_available = prepare_pillow()
-    external_tool = None if pillow_available else detect_external_tool(args.format)
+    if pyvips is not None:
+        backend = "vips"
+    elif prepare_pillow():
+        backend = "pillow"
+    else:
+        backend = "external"
+    external_tool = detect_external_tool(args.format) if backend == "external" else None
 
-    if not pillow_available and external_tool is None:
+    if backend == "external" and external_tool is None:
         raise SystemExit(
-            "No HEIC conversion backend available. Install pillow-heif & Pillow, ImageMagick, or heif-convert."
+            "No HEIC conversion backend available. "
+            "Install pyvips, pillow-heif & Pillow, ImageMagick, or heif-convert."
         )
 
-    for src in heic_files:
-        dst = destination_path(src, args.format)
-        print(f"{src.relative_to(source_dir)} -> {dst.relative_to(source_dir)}")
-        if args.dry_run:
-            continue
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        renamed = False
-        try:
-            if pillow_available:
-                convert_with_pillow(src, dst, args.format, args.quality)
-            else:
-                convert_with_external(src, dst, external_tool)
-        except ConversionError as exc:  # pragma: no cover - runtime failure path
-            message = str(exc)
-            if args.format == "jpg" and "JPEG image" in message:
-                if dst.exists():
-                    print(
-                        f"Skipping rename for {src.name}: destination {dst.name} already exists",
-                        file=sys.stderr,
-                    )
-                    continue
-                src.rename(dst)
-                renamed = True
-                print(f"Renamed mislabelled JPEG {src.name} -> {dst.name}")
-            else:
-                print(f"Failed to convert {src}: {message}", file=sys.stderr)
+    skipped = 0
+
+    def pending_files() -> Iterator[Path]:
+        nonlocal skipped
+        for src in itertools.chain([first], candidates):
+            if not args.force and is_up_to_date(src, destination_path(src, args.format)):
+                skipped += 1
                 continue
-        if args.remove_original and not renamed:
+            yield src
+
+    if args.dry_run:
+        for src in pending_files():
+            dst = destination_path(src, args.format)
+            print(f"{src.relative_to(source_dir)} -> {dst.relative_to(source_dir)}")
+    else:
+        options = {
+            "source_dir": source_dir,
+            "format": args.format,
+            "quality": args.quality,
+            "remove_original": args.remove_original,
+            "backend": backend,
+            "external_tool": external_tool,
+            "mogrify": mogrify_command(external_tool) if external_tool else None,
+        }
+        if options["mogrify"]:
+            convert = partial(_convert_batch, options=options)
+            work: Iterable = batched_by_directory(pending_files(), MOGRIFY_BATCH_SIZE)
+        else:
+            convert = partial(_convert_one, options=options)
+            work = pending_files()
+        max_workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            for messages in run_bounded(executor, convert, work, 2 * max_workers):
+                for message, is_error in messages:
+                    print(message, file=sys.stderr if is_error else sys.stdout)
+
+    if skipped:
+        print(f"Skipped {skipped} file(s) already converted (use --force to redo).")
+
+
+def run_bounded(executor: Executor, fn: Callable, items: Iterable, limit: int) -> Iterator:
+    """Like executor.map, but keeps at most ``limit`` tasks queued so input is consumed lazily."""
+    in_flight: deque[Future] = deque()
+    for item in items:
+        in_flight.append(executor.submit(fn, item))
+        if len(in_flight) >= limit:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def _init_worker() -> None:
+    # Worker processes started via spawn do not inherit the registered HEIF opener.
+    prepare_pillow()
+
+
+def _convert_one(src: Path, options: dict[str, object]) -> list[tuple[str, bool]]:
+    """Convert a single file; returns (message, is_error) pairs for the parent to print."""
+    source_dir = options["source_dir"]
+    target_format = options["format"]
+    dst = destination_path(src, target_format)
+    messages = [(f"{src.relative_to(source_dir)} -> {dst.relative_to(source_dir)}", False)]
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    renamed = False
+    try:
+        if options["backend"] == "vips":
+            convert_with_vips(src, dst, target_format, options["quality"])
+        elif options["backend"] == "pillow":
+            convert_with_pillow(src, dst, target_format, options["quality"])
+        else:
+            convert_with_external(src, dst, options["external_tool"])
+    except ConversionError as exc:  # pragma: no cover - runtime failure path
+        message = str(exc)
+        if target_format == "jpg" and "JPEG image" in message:
+            if dst.exists():
+                messages.append(
+                    (f"Skipping rename for {src.name}: destination {dst.name} already exists", True)
+                )
+                return messages
+            src.rename(dst)
+            renamed = True
+            messages.append((f"Renamed mislabelled JPEG {src.name} -> {dst.name}", False))
+        else:
+            messages.append((f"Failed to convert {src}: {message}", True))
+            return messages
+    if options["remove_original"] and not renamed:
+        src.unlink(missing_ok=True)
+    return messages
+
+
+def _convert_batch(sources: list[Path], options: dict[str, object]) -> list[tuple[str, bool]]:
+    """Convert same-directory files with one mogrify run; retry per file if it fails."""
+    source_dir = options["source_dir"]
+    target_format = options["format"]
+    cmd = [*options["mogrify"], "-format", target_format]
+    if options["quality"] is not None:
+        cmd.extend(["-quality", str(options["quality"])])
+    cmd.extend(["-path", str(sources[0].parent), *(str(src) for src in sources)])
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        messages: list[tuple[str, bool]] = []
+        for src in sources:
+            messages.extend(_convert_one(src, options))
+        return messages
+
+    messages = []
+    for src in sources:
+        dst = destination_path(src, target_format)
+        messages.append((f"{src.relative_to(source_dir)} -> {dst.relative_to(source_dir)}", False))
+        if options["remove_original"]:
             src.unlink(missing_ok=True)
+    return messages
+
+
+def batched_by_directory(paths: Iterable[Path], size: int) -> Iterator[list[Path]]:
+    pending: dict[Path, list[Path]] = {}
+    for path in paths:
+        batch = pending.setdefault(path.parent, [])
+        batch.append(path)
+        if len(batch) >= size:
+            yield pending.pop(path.parent)
+    yield from pending.values()
 
 
 def find_heic_files(root: Path) -> Iterable[Path]:
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() in HEIC_EXTENSIONS:
-            yield path
+    # DirEntry type checks use cached dirent data, avoiding a stat per file.
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_heic_files(Path(entry.path))
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in HEIC_EXTENSIONS:
+                yield Path(entry.path)
 
 
 def destination_path(src: Path, target_format: str) -> Path:
     return src.with_suffix(f".{target_format}")
 
 
+def is_up_to_date(src: Path, dst: Path) -> bool:
+    try:
+        return dst.stat().st_mtime >= src.stat().st_mtime
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=None)
 def prepare_pillow() -> bool:
     if register_heif_opener and Image:
         register_heif_opener()
@@ -147,21 +273,47 @@ def convert_with_pillow(src: Path, dst: Path, target_format: str, quality: Optio
         rgb.save(dst, format=target_format.upper(), **save_kwargs)
 
 
-def detect_external_tool(target_format: str) -> Optional[list[str]]:
+def convert_with_vips(src: Path, dst: Path, target_format: str, quality: Optional[int]) -> None:
+    # libvips streams the decode in tiles instead of materialising a full RGB copy.
+    try:
+        image = pyvips.Image.new_from_file(str(src), access="sequential")
+        loader = image.get("vips-loader") if image.get_typeof("vips-loader") else ""
+        if loader.startswith("jpegload") and target_format == "jpg":
+            src.rename(dst)
+            return
+        save_kwargs = {"Q": quality} if quality is not None else {}
+        image.write_to_file(str(dst), **save_kwargs)
+    except pyvips.Error as exc:
+        raise ConversionError(str(exc)) from exc
+
+
+@lru_cache(maxsize=None)
+def detect_external_tool(target_format: str) -> Optional[tuple[str, ...]]:
     magick = shutil.which("magick")
     convert = shutil.which("convert")
     heif_convert = shutil.which("heif-convert")
 
     if magick:
-        return [magick]
+        return (magick,)
     if convert:
-        return [convert]
+        return (convert,)
     if target_format == "jpg" and heif_convert:
-        return [heif_convert]
+        return (heif_convert,)
     return None
 
 
-def convert_with_external(src: Path, dst: Path, tool_cmd: Optional[list[str]]) -> None:
+def mogrify_command(tool_cmd: Sequence[str]) -> Optional[list[str]]:
+    """Return the batch (mogrify) form of an ImageMagick tool, if there is one."""
+    name = Path(tool_cmd[0]).name
+    if name == "magick":
+        return [tool_cmd[0], "mogrify"]
+    if name == "convert":
+        mogrify = shutil.which("mogrify")
+        return [mogrify] if mogrify else None
+    return None  # heif-convert has no batch mode
+
+
+def convert_with_external(src: Path, dst: Path, tool_cmd: Optional[Sequence[str]]) -> None:
     if not tool_cmd:
         raise ConversionError("No external tool available")
 
@@ -1,12 +1,29 @@
 #!/usr/bin/env python3
-"""Extract an audio clip from an MP4 and save it as MP3."""
+"""Extract an audio clip from an MP4 and save it as MP3 (or WAV / raw PCM)."""
 
 from __future__ import annotations
 
 import argparse
+import json
 import shutil
 import subprocess
 from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - only needed for extract_audio_to_array
+    np = None  # type: ignore
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+FORMAT_ARGS = {
+    "mp3": ["-acodec", "libmp3lame", "-b:a", "192k"],
+    "wav": ["-acodec", "pcm_s16le"],
+    "pcm_s16le": ["-f", "s16le", "-acodec", "pcm_s16le"],
+}
+FORMAT_SUFFIXES = {"mp3": ".mp3", "wav": ".wav", "pcm_s16le": ".pcm"}
 
 
 def parse_args() -> argparse.Namespace:
@@ -22,7 +39,13 @@ def parse_args() -> argparse.Namespace:
         "--output",
         "-o",
         type=Path,
-        help="Destination MP3 file (default: input name with .mp3)",
+        help="Destination file (default: input name with the format's extension)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=tuple(FORMAT_ARGS),
+        default="mp3",
+        help="Output format: mp3, wav, or headerless 16-bit PCM (default: mp3)",
     )
     parser.add_argument(
         "--ffmpeg",
@@ -30,6 +53,19 @@ def parse_args() -> argparse.Namespace:
         default="ffmpeg",
         help="Path to the ffmpeg executable (default: ffmpeg in PATH)",
     )
+    parser.add_argument(
+        "--ffprobe",
+        type=str,
+        help="Path to ffprobe (optional; defaults to autodetect)",
+    )
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help=(
+            "Copy the audio stream without re-encoding (--format mp3 only; the source must "
+            "already be MP3). Enabled automatically for MP3 sources written to .mp3."
+        ),
+    )
     parser.add_argument(
         "--start",
         type=float,
@@ -42,6 +78,14 @@ def parse_args() -> argparse.Namespace:
         default=0.0,
         help="Amount of audio (seconds) to trim from the beginning before exporting.",
     )
+    parser.add_argument(
+        "--clips",
+        type=Path,
+        help=(
+            "JSON file listing clips as [{\"start\": S, \"duration\": D, \"output\": PATH}, ...]; "
+            "all clips are cut in a single ffmpeg run, each shifted by --start and --trim-start"
+        ),
+    )
     parser.add_argument(
         "--overwrite",
         action="store_true",
@@ -50,6 +94,167 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def build_extract_cmd(
+    ffmpeg_path: str,
+    source: Path,
+    start: float,
+    duration: Optional[float],
+    target_format: str,
+    output: str,
+    overwrite: bool = True,
+    copy: bool = False,
+) -> list[str]:
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y" if overwrite else "-n",
+        "-ss",
+        str(start),
+        "-i",
+        str(source),
+    ]
+    if duration is not None:
+        cmd.extend(["-t", str(duration)])
+    cmd.extend(_codec_args(target_format, copy))
+    cmd.append(output)
+    return cmd
+
+
+def build_batch_cmd(
+    ffmpeg_path: str,
+    source: Path,
+    clips: list[tuple[float, Optional[float], Path]],
+    target_format: str,
+    overwrite: bool = True,
+    copy: bool = False,
+) -> list[str]:
+    """Cut every (start, duration, output) clip from one decode of ``source``."""
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y" if overwrite else "-n",
+        "-i",
+        str(source),
+    ]
+    for start, duration, output in clips:
+        cmd.extend(["-ss", str(start)])
+        if duration is not None:
+            cmd.extend(["-t", str(duration)])
+        cmd.extend(_codec_args(target_format, copy))
+        cmd.append(str(output))
+    return cmd
+
+
+def _codec_args(target_format: str, copy: bool) -> list[str]:
+    if copy:
+        return ["-vn", "-c:a", "copy"]
+    return ["-vn", *FORMAT_ARGS[target_format], "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS)]
+
+
+def load_clips(spec_path: Path, offset: float) -> list[tuple[float, Optional[float], Path]]:
+    """Read a clip spec; ``offset`` (--start plus --trim-start) is added to every clip start."""
+    try:
+        entries = json.loads(spec_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise SystemExit(f"Failed to read clip spec {spec_path}: {exc}")
+    if not isinstance(entries, list) or not entries:
+        raise SystemExit(f"Clip spec {spec_path} must be a non-empty JSON list")
+
+    clips: list[tuple[float, Optional[float], Path]] = []
+    for idx, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict) or not entry.get("output"):
+            raise SystemExit(f"Clip #{idx} in {spec_path} needs an 'output' path")
+        try:
+            start = float(entry.get("start", 0.0))
+            duration = float(entry["duration"]) if entry.get("duration") is not None else None
+        except (TypeError, ValueError):
+            raise SystemExit(f"Clip #{idx} in {spec_path} has a non-numeric start or duration")
+        if start < 0 or (duration is not None and duration <= 0):
+            raise SystemExit(f"Clip #{idx} in {spec_path} needs start >= 0 and duration > 0")
+        clips.append((start + offset, duration, Path(entry["output"])))
+    return clips
+
+
+def probe_audio_codec(ffprobe_path: Optional[str], source: Path) -> Optional[str]:
+    if not ffprobe_path:
+        return None
+    try:
+        result = subprocess.run(
+            [
+                ffprobe_path,
+                "-v",
+                "error",
+                "-select_streams",
+                "a:0",
+                "-show_entries",
+                "stream=codec_name",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                str(source),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return result.stdout.strip() or None
+
+
+def extract_audio_to_array(
+    source: Path,
+    start: float = 0.0,
+    duration: Optional[float] = None,
+    ffmpeg_path: str = "ffmpeg",
+) -> "np.ndarray":
+    """Decode a clip straight into an int16 array shaped (samples, CHANNELS)."""
+    if np is None:
+        raise RuntimeError("numpy is required for extract_audio_to_array")
+    cmd = build_extract_cmd(ffmpeg_path, source, start, duration, "pcm_s16le", "pipe:1")
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(message or f"ffmpeg failed with exit code {result.returncode}")
+    return np.frombuffer(result.stdout, dtype=np.int16).reshape(-1, CHANNELS)
+
+
+def should_copy(args: argparse.Namespace, outputs: list[Path]) -> bool:
+    if args.format != "mp3" or any(path.suffix.lower() != ".mp3" for path in outputs):
+        return False
+    ffprobe_path = args.ffprobe or shutil.which("ffprobe")
+    return probe_audio_codec(ffprobe_path, args.source) == "mp3"
+
+
+def extract_clips(args: argparse.Namespace, ffmpeg_path: str) -> None:
+    clips = load_clips(args.clips, (args.start or 0.0) + args.trim_start)
+    outputs = [output for _, _, output in clips]
+    if not args.overwrite:
+        existing = [path for path in outputs if path.exists()]
+        if existing:
+            names = ", ".join(str(path) for path in existing)
+            raise SystemExit(f"Output file(s) {names} already exist. Use --overwrite to replace them.")
+
+    cmd = build_batch_cmd(
+        ffmpeg_path,
+        args.source,
+        clips,
+        args.format,
+        overwrite=args.overwrite,
+        copy=args.copy or should_copy(args, outputs),
+    )
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as exc:
+        raise SystemExit(f"ffmpeg failed with exit code {exc.returncode}")
+
+    for output in outputs:
+        print(f"Wrote {output}")
+
+
 def main() -> None:
     args = parse_args()
 
@@ -59,6 +264,9 @@ def main() -> None:
     if args.trim_start < 0:
         raise SystemExit("--trim-start must be zero or positive")
 
+    if args.copy and args.format != "mp3":
+        raise SystemExit("--copy only works with --format mp3; wav and pcm_s16le are always re-encoded")
+
     if not args.source.exists():
         raise SystemExit(f"Source file {args.source} does not exist")
 
@@ -66,43 +274,32 @@ def main() -> None:
     if not ffmpeg_path:
         raise SystemExit("ffmpeg executable not found; install ffmpeg or provide --ffmpeg path")
 
+    if args.clips:
+        if args.duration is not None or args.output is not None:
+            raise SystemExit("--clips cannot be combined with DURATION or --output")
+        extract_clips(args, ffmpeg_path)
+        return
+
     if args.output is None:
-        args.output = args.source.with_suffix(".mp3")
+        args.output = args.source.with_suffix(FORMAT_SUFFIXES[args.format])
 
     if args.output.exists() and not args.overwrite:
         raise SystemExit(f"Output file {args.output} already exists. Use --overwrite to replace it.")
 
+    copy_stream = args.copy or should_copy(args, [args.output])
+
     trim_start = args.trim_start
     effective_start = (args.start or 0.0) + trim_start
 
-    cmd = [
+    cmd = build_extract_cmd(
         ffmpeg_path,
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-y" if args.overwrite else "-n",
-        "-ss",
-        str(effective_start),
-        "-i",
-        str(args.source),
-    ]
-
-    if args.duration is not None:
-        cmd.extend(["-t", str(args.duration)])
-
-    cmd.extend(
-        [
-            "-vn",
-            "-acodec",
-            "libmp3lame",
-            "-ar",
-            "44100",
-            "-ac",
-            "2",
-            "-b:a",
-            "192k",
-            str(args.output),
-        ]
+        args.source,
+        effective_start,
+        args.duration,
+        args.format,
+        str(args.output),
+        overwrite=args.overwrite,
+        copy=copy_stream,
     )
 
     try:
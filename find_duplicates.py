@@ -10,14 +10,29 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import mmap
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
 
 from PIL import Image
 
-BUFFER_SIZE = 1024 * 1024  # 1 MiB
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - only speeds up --deep
+    np = None  # type: ignore
+
+HEAD_SIZE = 64 * 1024  # bytes hashed before committing to a full read
+MMAP_THRESHOLD = 16 * 1024 * 1024
+HASH_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+PAIRWISE_TILE_BYTES = 64 * 1024 * 1024
+POPCOUNT_TABLE = (
+    np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+    if np is not None
+    else None
+)
 IMAGE_EXTENSIONS = {
     ".jpg",
     ".jpeg",
@@ -33,21 +48,89 @@ IMAGE_EXTENSIONS = {
 
 
 def hash_file(path: Path) -> str:
-    hasher = hashlib.md5()
     with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(BUFFER_SIZE)
-            if not chunk:
-                break
-            hasher.update(chunk)
-    return hasher.hexdigest()
+        fd = handle.fileno()
+        if os.fstat(fd).st_size < MMAP_THRESHOLD:
+            return hashlib.file_digest(handle, "blake2b").hexdigest()
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # Large media hashes straight from the page cache without Python-level reads.
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.blake2b(mapped).hexdigest()
 
 
-def iter_files(root: Path, follow_links: bool = False) -> Iterable[Path]:
-    for dirpath, _, filenames in os.walk(root, followlinks=follow_links):
-        directory = Path(dirpath)
-        for name in filenames:
-            yield directory / name
+def hash_head(path: Path, size: int = HEAD_SIZE) -> str:
+    with path.open("rb") as handle:
+        return hashlib.blake2b(handle.read(size)).hexdigest()
+
+
+def digest_all(
+    paths: Sequence[Path],
+    digest: Callable[[Path], str],
+    executor: ThreadPoolExecutor,
+) -> Iterator[Tuple[Path, str]]:
+    def safe_digest(path: Path) -> Tuple[Path, str | OSError]:
+        try:
+            return path, digest(path)
+        except OSError as exc:
+            return path, exc
+
+    # hashlib releases the GIL, so threads overlap reads with hashing.
+    for path, value in executor.map(safe_digest, paths):
+        if isinstance(value, OSError):
+            print(f"Warning: failed to read {path}: {value}")
+            continue
+        yield path, value
+
+
+def find_exact_duplicates(size_buckets: Dict[int, List[Path]]) -> List[List[Path]]:
+    """Narrow same-size files by a head hash, then confirm with a full hash."""
+    sizes = {
+        path: size for size, paths in size_buckets.items() if len(paths) > 1 for path in paths
+    }
+    duplicate_groups: List[List[Path]] = []
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        head_groups: Dict[Tuple[int, str], List[Path]] = defaultdict(list)
+        for path, digest in digest_all(list(sizes), hash_head, executor):
+            head_groups[(sizes[path], digest)].append(path)
+
+        needs_full_hash: List[Path] = []
+        for (size, _), group in head_groups.items():
+            if len(group) < 2:
+                continue
+            if size <= HEAD_SIZE:
+                # The head hash already covered the whole file.
+                duplicate_groups.append(group)
+            else:
+                needs_full_hash.extend(group)
+
+        full_groups: Dict[str, List[Path]] = defaultdict(list)
+        for path, digest in digest_all(needs_full_hash, hash_file, executor):
+            full_groups[digest].append(path)
+    duplicate_groups.extend(group for group in full_groups.values() if len(group) > 1)
+    return duplicate_groups
+
+
+def iter_files(
+    root: Path, follow_links: bool = False, min_size: int = 0
+) -> Iterator[Tuple[Path, int]]:
+    """Yield (path, size) for files of at least ``min_size`` bytes, one stat each."""
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=follow_links):
+                yield from iter_files(Path(entry.path), follow_links, min_size)
+                continue
+            if entry.is_symlink() and entry.is_dir():
+                continue  # a linked directory while not following links, as os.walk skipped it
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        if size >= min_size:
+            yield Path(entry.path), size
 
 
 def parse_args() -> argparse.Namespace:
@@ -86,20 +169,85 @@ def parse_args() -> argparse.Namespace:
 
 def average_hash(path: Path, hash_size: int = 8) -> int:
     with Image.open(path) as img:
-        img = img.convert("L").resize((hash_size, hash_size), Image.LANCZOS)
-        pixels = list(img.getdata())
-    avg = sum(pixels) / len(pixels)
-    bits = 0
-    for idx, value in enumerate(pixels):
-        if value >= avg:
-            bits |= 1 << idx
-    return bits
+        # JPEGs decode at a reduced DCT scale; a no-op for other formats.
+        img.draft("L", (hash_size * 8, hash_size * 8))
+        img = img.convert("L").resize((hash_size, hash_size), Image.BILINEAR)
+        if np is None:
+            values = list(img.getdata())
+        else:
+            pixels = np.asarray(img, dtype=np.uint8).ravel()
+    # Pixel idx maps to bit idx (row-major, least significant first).
+    if np is None:
+        avg = sum(values) / len(values)
+        return sum(1 << idx for idx, value in enumerate(values) if value >= avg)
+    bits = np.packbits(pixels >= pixels.mean(), bitorder="little")
+    return int.from_bytes(bits.tobytes(), "little")
+
+
+def phash_one(path: Path) -> Tuple[Path, int | OSError]:
+    try:
+        return path, average_hash(path)
+    except OSError as exc:
+        return path, exc
 
 
 def hamming_distance(a: int, b: int) -> int:
     return (a ^ b).bit_count()
 
 
+def pairs_within(hashes: Sequence[int], threshold: int, bits: int) -> Iterator[Tuple[int, int]]:
+    """Exhaustively yield index pairs within ``threshold`` bits, vectorised when NumPy is present."""
+    if np is None:
+        for idx, phash in enumerate(hashes):
+            for jdx in range(idx + 1, len(hashes)):
+                if hamming_distance(phash, hashes[jdx]) <= threshold:
+                    yield idx, jdx
+        return
+    width = max(1, (bits + 7) // 8)
+    packed = np.frombuffer(
+        b"".join(phash.to_bytes(width, "little") for phash in hashes), dtype=np.uint8
+    ).reshape(len(hashes), width)
+    # Compare a block of rows against every hash at a time to bound memory use.
+    rows_per_tile = max(1, PAIRWISE_TILE_BYTES // (len(hashes) * width))
+    for start in range(0, len(hashes), rows_per_tile):
+        block = packed[start : start + rows_per_tile]
+        distances = POPCOUNT_TABLE[block[:, None, :] ^ packed[None, :, :]].sum(axis=-1)
+        for row, col in np.argwhere(distances <= threshold):
+            idx = start + int(row)
+            if int(col) > idx:
+                yield idx, int(col)
+
+
+def candidate_pairs(hashes: Sequence[int], threshold: int) -> Iterator[Tuple[int, int]]:
+    """Yield index pairs that may lie within ``threshold`` bits of each other.
+
+    Splitting the hash into ``threshold + 1`` chunks means any two hashes within
+    the threshold agree exactly on at least one chunk (pigeonhole), so only
+    hashes sharing a chunk value need comparing.
+    """
+    bits = max(phash.bit_length() for phash in hashes)
+    chunk_count = threshold + 1
+    if chunk_count > bits:
+        yield from pairs_within(hashes, threshold, bits)
+        return
+
+    seen: set[Tuple[int, int]] = set()
+    start = 0
+    for chunk in range(chunk_count):
+        width = (bits - start) // (chunk_count - chunk)
+        mask = (1 << width) - 1
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for idx, phash in enumerate(hashes):
+            buckets[(phash >> start) & mask].append(idx)
+        for members in buckets.values():
+            for pos, idx in enumerate(members):
+                for jdx in members[pos + 1 :]:
+                    if (idx, jdx) not in seen:
+                        seen.add((idx, jdx))
+                        yield idx, jdx
+        start += width
+
+
 def build_similar_groups(
     images: Sequence[Tuple[Path, int]],
     threshold: int,
@@ -108,24 +256,32 @@ def build_similar_groups(
         return []
 
     parent = list(range(len(images)))
+    rank = [0] * len(images)
 
     def find(idx: int) -> int:
-        if parent[idx] != idx:
-            parent[idx] = find(parent[idx])
-        return parent[idx]
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
 
     def union(a: int, b: int) -> None:
         root_a = find(a)
         root_b = find(b)
-        if root_a != root_b:
-            parent[root_b] = root_a
-
-    for idx in range(len(images)):
-        _, hash_a = images[idx]
-        for jdx in range(idx + 1, len(images)):
-            _, hash_b = images[jdx]
-            if hamming_distance(hash_a, hash_b) <= threshold:
-                union(idx, jdx)
+        if root_a == root_b:
+            return
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+
+    hashes = [phash for _, phash in images]
+    bit_count = int.bit_count  # bound once; this loop runs per candidate pair
+    for idx, jdx in candidate_pairs(hashes, threshold):
+        if find(idx) == find(jdx):
+            continue
+        if bit_count(hashes[idx] ^ hashes[jdx]) <= threshold:
+            union(idx, jdx)
 
     clusters: Dict[int, List[Path]] = defaultdict(list)
     for idx, (path, _) in enumerate(images):
@@ -141,26 +297,15 @@ def main() -> None:
     if not args.root.exists() or not args.root.is_dir():
         raise SystemExit(f"Root directory {args.root} does not exist or is not a directory")
 
-    candidates: Dict[str, List[Path]] = defaultdict(list)
+    size_buckets: Dict[int, List[Path]] = defaultdict(list)
     processed: List[Path] = []
-    total_files = 0
 
-    for path in iter_files(args.root, follow_links=args.follow_links):
-        try:
-            if path.stat().st_size < args.min_size:
-                continue
-        except OSError:
-            continue
-        try:
-            digest = hash_file(path)
-        except OSError as exc:
-            print(f"Warning: failed to read {path}: {exc}")
-            continue
-        candidates[digest].append(path)
+    for path, size in iter_files(args.root, args.follow_links, args.min_size):
+        size_buckets[size].append(path)
         processed.append(path)
-        total_files += 1
 
-    duplicate_groups = [paths for paths in candidates.values() if len(paths) > 1]
+    total_files = len(processed)
+    duplicate_groups = find_exact_duplicates(size_buckets)
     if duplicate_groups:
         print(
             f"Scanned {total_files} file(s); found {len(duplicate_groups)} exact duplicate group(s):"
@@ -175,16 +320,14 @@ def main() -> None:
     if not args.deep:
         return
 
+    image_paths = [path for path in processed if path.suffix.lower() in IMAGE_EXTENSIONS]
     image_entries: List[Tuple[Path, int]] = []
-    for path in processed:
-        if path.suffix.lower() not in IMAGE_EXTENSIONS:
-            continue
-        try:
-            phash = average_hash(path)
-        except OSError as exc:
-            print(f"Warning: failed to hash {path}: {exc}")
-            continue
-        image_entries.append((path, phash))
+    with ProcessPoolExecutor() as executor:
+        for path, phash in executor.map(phash_one, image_paths, chunksize=16):
+            if isinstance(phash, OSError):
+                print(f"Warning: failed to hash {path}: {phash}")
+                continue
+            image_entries.append((path, phash))
 
     similar_groups = build_similar_groups(image_entries, args.hamming)
     if similar_groups:
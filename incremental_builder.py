@@ -11,26 +11,70 @@ that versioned output.
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import re
 import shutil
 import subprocess
-import time
 import tempfile
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from fractions import Fraction
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Set
-
-try:
-    from watchfiles import watch as watchfiles_watch
-except ImportError:  # pragma: no cover - optional dependency
-    watchfiles_watch = None
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set
 
 import sequence_to_video as stv
-from lib import collage, text_renderer
+from lib import collage, concat, segment_cache, still_encoder, text_renderer, versioning, watch
 from lib.subtitle_renderer import create_ass_subtitle
 from lib.text_utils import TextLayout, combine_overlay_texts, load_text_layout
 
 CONFIG_PATH = Path("config.json")
+# Config keys that do not change how an individual segment looks: final concat/mux settings,
+# slide selection (sources are tracked as dependencies), and durations, which are resolved
+# into each segment's own duration before hashing.
+SEGMENT_NEUTRAL_CONFIG_KEYS = frozenset(
+    {
+        "audio_files",
+        "output",
+        "keep_temp",
+        "work_dir",
+        "render_batch_size",
+        "concurrent_renders",
+        "concat_tool",
+        "segment_cache_max_mb",
+        "source_dir",
+        "chunk_size",
+        "chunk_index",
+        "duration_image",
+        "duration_overlay",
+        "duration_text",
+    }
+)
+# Image segments rendered per ffmpeg process; keeps the open inputs and encoders bounded.
+DEFAULT_RENDER_BATCH_SIZE = 16
+DEFAULT_SEGMENT_CACHE_MAX_MB = 2048
+
+# Last segment plan and the source-directory listing/arguments it was built from.
+_PLAN_CACHE: Dict[str, tuple[tuple, List["SegmentInfo"]]] = {}
+# Planned segment per media prefix with its inputs, so a replan only redoes the prefixes that changed.
+_SEGMENT_PLAN_CACHE: Dict[tuple[str, str], tuple[tuple, Optional[TextLayout], "SegmentInfo"]] = {}
+# What each output base was last exported from, so watch rebuilds can skip no-op exports.
+_LAST_EXPORT: Dict[Path, tuple] = {}
+# ffprobe results keyed by (path, mtime_ns, size) so unchanged clips are probed once per session.
+_STREAM_INFO_CACHE: Dict[tuple[str, int, int], Optional[dict[str, object]]] = {}
+# H.264 levels as (level_idc, max frame size in macroblocks, max macroblocks per second).
+H264_LEVEL_LIMITS = (
+    (30, 1620, 40500),
+    (31, 3600, 108000),
+    (32, 5120, 216000),
+    (40, 8192, 245760),
+    (42, 8704, 522240),
+    (50, 22080, 589824),
+    (51, 36864, 983040),
+    (52, 36864, 2073600),
+)
+STREAM_COPY_PROFILES = {"High", "Main"}
 
 
 @dataclass(frozen=True)
@@ -43,6 +87,11 @@ class SegmentInfo:
     overlay_text: Optional[str] = None
     duration: Optional[float] = None
     visual_sources: tuple[Path, ...] = ()
+    # Segment file name, derived once here since cached plans are reused across rebuilds.
+    output_name: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "output_name", segment_file_name(self))
 
 
 @dataclass(frozen=True)
@@ -51,13 +100,18 @@ class BuildContext:
     input_paths: Set[Path]
 
 
+_SLUG_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+_SLUG_REPEATS = re.compile(r"_+")
+
+
+@lru_cache(maxsize=4096)
 def _slugify(name: str) -> str:
-    cleaned = re.sub(r"[^A-Za-z0-9_.-]+", "_", name.strip())
-    cleaned = re.sub(r"_+", "_", cleaned)
+    cleaned = _SLUG_UNSAFE.sub("_", name.strip())
+    cleaned = _SLUG_REPEATS.sub("_", cleaned)
     return cleaned.strip("_") or "segment"
 
 
-def segment_output_path(segments_dir: Path, segment: SegmentInfo) -> Path:
+def segment_file_name(segment: SegmentInfo) -> str:
     names = [_slugify(segment.source.name)]
     if segment.overlay_sources:
         names.extend(_slugify(dep.name) for dep in segment.overlay_sources)
@@ -67,60 +121,41 @@ def segment_output_path(segments_dir: Path, segment: SegmentInfo) -> Path:
     combined = f"{prefix}_{slug}" if slug else prefix
     if len(combined) > 120:
         combined = combined[:120]
-    return segments_dir / f"{combined}.mp4"
-
-
-def has_existing_output(base: Path) -> bool:
-    if base.exists():
-        return True
-    stem = base.stem
-    suffix = base.suffix or ""
-    pattern = re.compile(rf"^{re.escape(stem)}-(\d+){re.escape(suffix)}$")
-    for candidate in base.parent.glob(f"{stem}-*{suffix}"):
-        if pattern.match(candidate.name):
-            return True
-    return False
-
-
-def is_within(path: Path, directory: Path) -> bool:
-    try:
-        path.relative_to(directory)
-        return True
-    except ValueError:
-        return False
+    return f"{combined}.mp4"
 
 
-def filter_relevant_changes(changed_paths: Iterable[Path], input_paths: Set[Path]) -> List[Path]:
-    relevant: Set[Path] = set()
-    directories = {p for p in input_paths if p.is_dir()}
-    resolved_inputs = {p.resolve() for p in input_paths}
-    for raw_path in changed_paths:
-        candidate = raw_path.resolve()
-        if candidate in resolved_inputs:
-            relevant.add(candidate)
-            continue
-        if any(is_within(candidate, directory) for directory in directories):
-            relevant.add(candidate)
-    return sorted(relevant)
+def segment_output_path(segments_dir: Path, segment: SegmentInfo) -> Path:
+    return segments_dir / segment.output_name
 
 
 def load_config(config_path: Path) -> dict[str, object]:
     return stv.load_config(config_path)
 
 
+@lru_cache(maxsize=None)
+def suffix_kinds() -> Dict[str, str]:
+    """Map lower-case suffixes to "image"/"video"/"text" (built lazily: stv imports this module)."""
+    kinds = {suffix: "text" for suffix in stv.TEXT_EXTENSIONS}
+    kinds.update((suffix, "video") for suffix in stv.VIDEO_EXTENSIONS)
+    kinds.update((suffix, "image") for suffix in stv.IMAGE_EXTENSIONS)
+    return kinds
+
+
 def iter_media_prefixes(source_dir: Path) -> Iterable[str]:
-    seen: set[str] = set()
-    for path in sorted(source_dir.iterdir(), key=lambda p: p.name):
-        if not path.is_file():
-            continue
-        suffix = path.suffix.lower()
-        if suffix not in stv.IMAGE_EXTENSIONS and suffix not in stv.VIDEO_EXTENSIONS:
-            continue
-        prefix = path.stem.split("_", 1)[0]
-        if prefix in seen:
-            continue
-        seen.add(prefix)
-        yield prefix
+    kinds = suffix_kinds()
+    # DirEntry.is_file() answers from the directory read itself. Dedup while scanning and sort
+    # one name per prefix; ordering by each prefix's first name keeps the old slide order.
+    first_names: dict[str, str] = {}
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if kinds.get(ext.lower()) not in ("image", "video") or not entry.is_file():
+                continue
+            prefix = stem.partition("_")[0]
+            known = first_names.get(prefix)
+            if known is None or entry.name < known:
+                first_names[prefix] = entry.name
+    return sorted(first_names, key=first_names.__getitem__)
 
 
 def list_media(source_dir: Path) -> List[Path]:
@@ -139,73 +174,131 @@ def build_segment_plan(
     else:
         selected = list(media_files)
 
+    # Split once into plain strings; Path.parent/.name and Path hashing dominate large plans.
+    locations = [os.path.split(os.fspath(path)) for path in selected]
+    by_directory: Dict[str, Set[str]] = {}
+    for directory, name in locations:
+        by_directory.setdefault(directory, set()).add(name)
+    # One directory scan per source folder rather than one glob per slide.
+    assets: Dict[str, Dict[str, tuple]] = {
+        directory: collage.collect_assets_for(Path(directory), names)
+        for directory, names in by_directory.items()
+    }
+
     plan: List[SegmentInfo] = []
-    index = 0
-    for entry in selected:
-        prefix = entry.name
-        visuals, overlays = collage.collect_assets(entry.parent, prefix)
+    for location in locations:
+        visuals, overlays = assets[location[0]][location[1]]
         if not visuals:
             continue
-
-        image_files = [path for path in visuals if path.suffix.lower() in stv.IMAGE_EXTENSIONS]
-        video_files = [path for path in visuals if path.suffix.lower() in stv.VIDEO_EXTENSIONS]
-
-        overlay_layout: Optional[TextLayout] = None
-        overlay_text: Optional[str] = None
-        if overlays:
-            combined = combine_overlay_texts(overlays)
-            if combined.lines or combined.title or combined.metadata:
-                overlay_layout = combined
-                overlay_text = combined.overlay_text()
-                if not overlay_text:
-                    overlay_text = None
-
-        duration_override: Optional[float] = None
-        if overlay_layout:
-            duration_str = overlay_layout.metadata.get("duration")
-            if duration_str:
-                try:
-                    duration_override = float(duration_str)
-                except ValueError:
-                    duration_override = None
-
-        if video_files and not image_files:
-            plan.append(
-                SegmentInfo(
-                    index=index + 1,
-                    source=video_files[0],
-                    kind="video",
-                    overlay_sources=tuple(overlays),
-                    overlay_layout=overlay_layout,
-                    overlay_text=overlay_text,
-                    duration=None,
-                    visual_sources=tuple(video_files),
-                )
-            )
-            index += 1
+        # combine_overlay_texts hands back the same layout object while the text files are unchanged.
+        combined = combine_overlay_texts(overlays) if overlays else None
+        key = (len(plan) + 1, tuple(visuals), tuple(overlays), duration_image, duration_overlay)
+        cached = _SEGMENT_PLAN_CACHE.get(location)
+        if cached and cached[0] == key and cached[1] is combined:
+            plan.append(cached[2])
             continue
+        segment = plan_segment(len(plan) + 1, visuals, overlays, combined, duration_image, duration_overlay)
+        _SEGMENT_PLAN_CACHE[location] = (key, combined, segment)
+        plan.append(segment)
 
-        image_sources = image_files if image_files else visuals
-        duration_value: Optional[float] = (
-            duration_override
-            if duration_override is not None
-            else (duration_overlay if overlay_text else duration_image)
-        )
+    return plan
 
-        plan.append(
-            SegmentInfo(
-                index=index + 1,
-                source=image_sources[0],
-                kind="image",
-                overlay_sources=tuple(overlays),
-                overlay_layout=overlay_layout,
-                overlay_text=overlay_text,
-                duration=duration_value,
-                visual_sources=tuple(image_sources),
-            )
+
+def plan_segment(
+    index: int,
+    visuals: Sequence[Path],
+    overlays: Sequence[Path],
+    combined: Optional[TextLayout],
+    duration_image: float,
+    duration_overlay: float,
+) -> SegmentInfo:
+    kinds = suffix_kinds()
+    image_files: List[Path] = []
+    video_files: List[Path] = []
+    for path in visuals:
+        kind = kinds.get(path.suffix.lower())
+        if kind == "image":
+            image_files.append(path)
+        elif kind == "video":
+            video_files.append(path)
+
+    overlay_layout: Optional[TextLayout] = None
+    overlay_text: Optional[str] = None
+    if combined is not None:
+        if combined.lines or combined.title or combined.metadata:
+            overlay_layout = combined
+            overlay_text = combined.overlay_text()
+            if not overlay_text:
+                overlay_text = None
+
+    duration_override: Optional[float] = None
+    if overlay_layout:
+        duration_str = overlay_layout.metadata.get("duration")
+        if duration_str:
+            try:
+                duration_override = float(duration_str)
+            except ValueError:
+                duration_override = None
+
+    if video_files and not image_files:
+        return SegmentInfo(
+            index=index,
+            source=video_files[0],
+            kind="video",
+            overlay_sources=tuple(overlays),
+            overlay_layout=overlay_layout,
+            overlay_text=overlay_text,
+            duration=None,
+            visual_sources=tuple(video_files),
         )
-        index += 1
 
+    image_sources = image_files if image_files else list(visuals)
+    duration_value: Optional[float] = (
+        duration_override
+        if duration_override is not None
+        else (duration_overlay if overlay_text else duration_image)
+    )
+    return SegmentInfo(
+        index=index,
+        source=image_sources[0],
+        kind="image",
+        overlay_sources=tuple(overlays),
+        overlay_layout=overlay_layout,
+        overlay_text=overlay_text,
+        duration=duration_value,
+        visual_sources=tuple(image_sources),
+    )
+
+
+def source_fingerprint(
+    source_dir: Path, stat_cache: Optional[segment_cache.StatCache] = None
+) -> tuple:
+    """(name, mtime_ns, size) of every entry in ``source_dir``, from one directory scan.
+
+    The stats land in ``stat_cache`` so the staleness checks that follow need no syscalls.
+    """
+    stats = (stat_cache or segment_cache.StatCache()).scan(source_dir)
+    return tuple(sorted((name, stat.st_mtime_ns, stat.st_size) for name, stat in stats.items()))
+
+
+def cached_segment_plan(
+    source_dir: Path,
+    limit: Optional[int],
+    duration_image: float,
+    duration_overlay: float,
+    duration_text: float,
+    force: bool = False,
+    stat_cache: Optional[segment_cache.StatCache] = None,
+) -> List[SegmentInfo]:
+    """Reuse the previous plan while neither the source listing nor the plan inputs changed."""
+    key = (source_fingerprint(source_dir, stat_cache), limit, duration_image, duration_overlay, duration_text)
+    cached = _PLAN_CACHE.get(str(source_dir))
+    if cached and cached[0] == key and not force:
+        return cached[1]
+    plan = build_segment_plan(
+        list_media(source_dir), limit, duration_image, duration_overlay, duration_text
+    )
+    _PLAN_CACHE[str(source_dir)] = (key, plan)
     return plan
 
 
@@ -228,25 +321,149 @@ def list_dependencies(segment: SegmentInfo) -> List[Path]:
 def needs_render(
     output: Path,
     dependencies: Sequence[Path],
-    additional_mtime: float,
+    cmd_hash: str,
+    manifest: dict[str, dict],
+    stat_cache: Optional[segment_cache.StatCache] = None,
 ) -> bool:
-    if not output.exists():
+    """Compare dependency content hashes and render settings with the manifest entry.
+
+    The entry for ``output`` is refreshed in place; hashes are only recomputed for
+    dependencies whose size or mtime changed since the last build.
+    """
+    previous = manifest.get(output.name) or {}
+    cached_deps = previous.get("deps") or {}
+    try:
+        deps = {
+            str(dep): segment_cache.fingerprint(dep, cached_deps.get(str(dep)), stat_cache)
+            for dep in dependencies
+        }
+    except OSError:
+        manifest.pop(output.name, None)
         return True
-    output_mtime = output.stat().st_mtime
-    if additional_mtime > output_mtime:
+    manifest[output.name] = {"deps": deps, "cmd_hash": cmd_hash}
+    output_exists = stat_cache.exists(output) if stat_cache else output.exists()
+    if not output_exists or previous.get("cmd_hash") != cmd_hash:
         return True
-    for dep in dependencies:
-        try:
-            if dep.stat().st_mtime > output_mtime:
-                return True
-        except OSError:
-            return True
-    return False
+    if deps.keys() != cached_deps.keys():
+        return True
+    return any(deps[key]["sha256"] != cached_deps[key].get("sha256") for key in deps)
+
+
+def segment_settings(segment: SegmentInfo, shared: dict[str, object]) -> dict[str, object]:
+    return {
+        **shared,
+        "index": segment.index,
+        "kind": segment.kind,
+        "duration": segment.duration,
+        "overlay_text": segment.overlay_text,
+    }
+
+
+def content_settings(
+    segment: SegmentInfo, shared: dict[str, object], fps: int, default_duration: float
+) -> dict[str, object]:
+    """Segment settings without the slide position, which only matters through the motion plan.
+
+    The year label and debug filename are burned in from the source name, so they are part of
+    the key: renaming ``1978-0001.jpg`` to ``1985-0001.jpg`` must not reuse the old render.
+    """
+    motion = (
+        stv.get_motion_plan(segment.index, segment.duration or default_duration, fps)
+        if segment.kind == "image"
+        else None
+    )
+    return {
+        **segment_settings(segment, shared),
+        "index": None,
+        "motion": repr(motion),
+        "year_label": stv.infer_year_text(segment.source) if segment.kind != "text" else None,
+        "debug_text": segment.source.name if stv.SHOW_FILENAME else None,
+    }
+
+
+@lru_cache(maxsize=1)
+def _subtitle_code_hash() -> str:
+    return segment_cache.sources_hash(
+        [Path(text_renderer.__file__), Path(text_renderer.__file__).with_name("subtitle_renderer.py")]
+    )
 
 
-def render_image_segment(
+def prepare_overlay_subtitle(
+    segment: SegmentInfo, subtitle_root: Path, width: int, height: int
+) -> Optional[Path]:
+    """Return the segment's ASS overlay, if it has one.
+
+    Files live under ``subtitle_root/by_hash`` keyed by everything that shapes them, so slides
+    sharing a caption, and later rebuilds of the same caption, reuse one file.
+    """
+    if not (segment.kind == "image" and segment.overlay_layout and segment.overlay_text):
+        return None
+    digest = segment_cache.settings_hash(
+        [
+            repr(segment.overlay_layout),
+            width,
+            height,
+            segment.duration,
+            stv.FONT_PATH,
+            text_renderer.TITLE_FONT_SIZE,
+            text_renderer.BODY_FONT_SIZE,
+            _subtitle_code_hash(),
+        ]
+    )[:16]
+    by_hash = subtitle_root / "by_hash"
+    subtitle_path = by_hash / f"{digest}.ass"
+    if subtitle_path.exists():
+        return subtitle_path
+    by_hash.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=by_hash) as tmp_dir:
+        written = create_ass_subtitle(
+            segment.overlay_layout,
+            width,
+            height,
+            stv.FONT_PATH,
+            Path(tmp_dir),
+            duration=segment.duration,
+        )
+        os.replace(written, subtitle_path)
+    return subtitle_path
+
+
+def prepare_collage(
+    visuals: Sequence[Path],
+    subtitle_root: Path,
+    width: int,
+    height: int,
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str],
+) -> Path:
+    """Return a collage of ``visuals``, reusing ``subtitle_root/collages`` while it is newer.
+
+    Overlay or timing edits re-render the segment but leave the collage itself untouched.
+    """
+    digest = segment_cache.settings_hash(
+        [[str(path) for path in visuals], width, height, _collage_code_hash()]
+    )[:16]
+    collages = subtitle_root / "collages"
+    collage_path = collages / f"{digest}.png"
+    try:
+        if collage_path.stat().st_mtime_ns >= max(path.stat().st_mtime_ns for path in visuals):
+            return collage_path
+    except OSError:
+        pass
+    collages.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=collages) as tmp_dir:
+        built = collage.build_collage(ffmpeg_path, ffprobe_path, visuals, width, height, Path(tmp_dir))
+        os.replace(built, collage_path)
+    return collage_path
+
+
+@lru_cache(maxsize=1)
+def _collage_code_hash() -> str:
+    return segment_cache.sources_hash([Path(collage.__file__)])
+
+
+def prepare_image_segment(
     segment: SegmentInfo,
-    output_path: Path,
     subtitle_root: Path,
     width: int,
     height: int,
@@ -254,21 +471,18 @@ def render_image_segment(
     ffmpeg_path: str,
     ffprobe_path: Optional[str],
     default_duration: float,
-) -> None:
-    overlay_subtitle_path: Optional[Path] = None
-    if segment.overlay_layout and segment.overlay_text:
-        subtitle_dir = subtitle_root / f"{segment.index:04d}"
-        if subtitle_dir.exists():
-            shutil.rmtree(subtitle_dir)
-        subtitle_dir.mkdir(parents=True, exist_ok=True)
-        overlay_subtitle_path = create_ass_subtitle(
-            segment.overlay_layout,
-            width,
-            height,
-            stv.FONT_PATH,
-            subtitle_dir,
-            duration=segment.duration,
-        )
+    input_label: str = "0:v",
+    label_prefix: str = "v",
+    subtitles: Optional[Mapping[int, Optional[Path]]] = None,
+) -> tuple[Path, float, str, str]:
+    """Return (still image, duration, filter graph, output label) for an image segment.
+
+    ``subtitles`` holds overlays already written by run_build; others are written here.
+    """
+    if subtitles is not None and segment.index in subtitles:
+        overlay_subtitle_path = subtitles[segment.index]
+    else:
+        overlay_subtitle_path = prepare_overlay_subtitle(segment, subtitle_root, width, height)
 
     still_duration = segment.duration or default_duration
     label = stv.infer_year_text(segment.source)
@@ -282,66 +496,300 @@ def render_image_segment(
         debug_text,
         overlay_subtitle_path,
         motion_plan,
+        input_label=input_label,
+        label_prefix=label_prefix,
     )
-    def _render_with_input(input_path: Path) -> None:
-        cmd = [
-            ffmpeg_path,
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-y",
-            "-loop",
-            "1",
-            "-framerate",
-            str(fps),
-            "-t",
-            f"{still_duration}",
-            "-i",
-            str(input_path),
-            "-f",
-            "lavfi",
-            "-t",
-            f"{still_duration}",
-            "-i",
-            "anullsrc=channel_layout=stereo:sample_rate=48000",
-            "-shortest",
-            "-filter_complex",
-            filter_graph,
-            "-map",
-            f"[{filter_output}]",
-            "-map",
-            "1:a:0",
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
-            "-r",
-            str(fps),
-            "-c:a",
-            "aac",
-            "-b:a",
-            "192k",
-            "-movflags",
-            "+faststart",
-            str(output_path),
-        ]
-        stv.run_ffmpeg(cmd)
 
     visuals = list(segment.visual_sources) or [segment.source]
     if len(visuals) > 1:
-        with tempfile.TemporaryDirectory() as tmp_dir_str:
-            tmp_dir = Path(tmp_dir_str)
-            source_image = collage.build_collage(
-                ffmpeg_path,
-                ffprobe_path,
-                visuals,
+        source_image = prepare_collage(
+            visuals, subtitle_root, width, height, ffmpeg_path, ffprobe_path
+        )
+    else:
+        source_image = visuals[0]
+    return source_image, still_duration, filter_graph, filter_output
+
+
+def still_input_args(input_path: Path, duration: float, fps: int) -> List[str]:
+    return ["-loop", "1", "-framerate", str(fps), "-t", f"{duration}", "-i", str(input_path)]
+
+
+def image_encoder_args(segment: SegmentInfo, fps: int, default_duration: float) -> List[str]:
+    """Encoder settings for image slides: a held frame needs no motion search, a pan/zoom some."""
+    moving = stv.get_motion_plan(segment.index, segment.duration or default_duration, fps) is not None
+    return [*stv.video_encoder_args("ultrafast", None if moving else "stillimage"), "-g", str(fps * 2)]
+
+
+def segment_output_args(
+    fps: int, output_path: Path, encoder_args: Optional[List[str]] = None
+) -> List[str]:
+    return [
+        *(encoder_args if encoder_args is not None else stv.video_encoder_args()),
+        "-r",
+        str(fps),
+        "-c:a",
+        "aac",
+        "-b:a",
+        "192k",
+        "-movflags",
+        "+faststart",
+        *stv.encoder_thread_args(),
+        str(output_path),
+    ]
+
+
+def is_plain_still(segment: SegmentInfo, fps: int, default_duration: float) -> bool:
+    """True for single images with nothing drawn on them, which PyAV can encode in-process."""
+    return (
+        still_encoder.available()
+        and stv.VIDEO_ENCODER == "libx264"
+        and segment.kind == "image"
+        and len(segment.visual_sources) <= 1
+        and segment.overlay_text is None
+        and not stv.SHOW_FILENAME
+        and stv.infer_year_text(segment.source) is None
+        and stv.get_motion_plan(segment.index, segment.duration or default_duration, fps) is None
+    )
+
+
+def render_image_segment(
+    segment: SegmentInfo,
+    output_path: Path,
+    subtitle_root: Path,
+    width: int,
+    height: int,
+    fps: int,
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str],
+    default_duration: float,
+    subtitles: Optional[Mapping[int, Optional[Path]]] = None,
+) -> None:
+    if is_plain_still(segment, fps, default_duration):
+        try:
+            still_encoder.encode_still(
+                segment.source,
+                output_path,
+                segment.duration or default_duration,
+                fps,
                 width,
                 height,
-                tmp_dir,
+                stv.FFMPEG_THREADS,
             )
-            _render_with_input(source_image)
-    else:
-        _render_with_input(visuals[0])
+            return
+        except still_encoder.ENCODE_ERRORS:
+            pass  # e.g. a HEIC without pillow-heif; ffmpeg may still read it
+    source_image, still_duration, filter_graph, filter_output = prepare_image_segment(
+        segment,
+        subtitle_root,
+        width,
+        height,
+        fps,
+        ffmpeg_path,
+        ffprobe_path,
+        default_duration,
+        subtitles=subtitles,
+    )
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        *still_input_args(source_image, still_duration, fps),
+        "-f",
+        "lavfi",
+        "-t",
+        f"{still_duration}",
+        "-i",
+        "anullsrc=channel_layout=stereo:sample_rate=48000",
+        "-shortest",
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        f"[{filter_output}]",
+        "-map",
+        "1:a:0",
+        *segment_output_args(
+            fps, output_path, image_encoder_args(segment, fps, default_duration)
+        ),
+    ]
+    stv.run_ffmpeg(cmd)
+
+
+def render_image_batch(
+    batch: Sequence[tuple[SegmentInfo, Path]],
+    subtitle_root: Path,
+    width: int,
+    height: int,
+    fps: int,
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str],
+    default_duration: float,
+    subtitles: Optional[Mapping[int, Optional[Path]]] = None,
+) -> None:
+    """Render several image segments from one ffmpeg process, one labelled output per segment."""
+    input_args: List[str] = []
+    graphs: List[str] = []
+    output_args: List[str] = []
+    for idx, (segment, output_path) in enumerate(batch):
+        source_image, still_duration, filter_graph, filter_output = prepare_image_segment(
+            segment,
+            subtitle_root,
+            width,
+            height,
+            fps,
+            ffmpeg_path,
+            ffprobe_path,
+            default_duration,
+            input_label=f"{idx}:v",
+            label_prefix=f"s{idx}v",
+            subtitles=subtitles,
+        )
+        input_args.extend(still_input_args(source_image, still_duration, fps))
+        graphs.append(filter_graph)
+        graphs.append(
+            f"anullsrc=channel_layout=stereo:sample_rate=48000:d={still_duration}[s{idx}a]"
+        )
+        output_args.extend(["-map", f"[{filter_output}]", "-map", f"[s{idx}a]"])
+        output_args.extend(
+            segment_output_args(
+                fps, output_path, image_encoder_args(segment, fps, default_duration)
+            )
+        )
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        *input_args,
+        "-filter_complex",
+        ";".join(graphs),
+        *output_args,
+    ]
+    stv.run_ffmpeg(cmd)
+
+
+def probe_stream_info(ffprobe_path: Optional[str], source: Path) -> Optional[dict[str, object]]:
+    if not ffprobe_path:
+        return None
+    try:
+        stat = source.stat()
+    except OSError:
+        return None
+    key = (str(source), stat.st_mtime_ns, stat.st_size)
+    if key in _STREAM_INFO_CACHE:
+        return _STREAM_INFO_CACHE[key]
+    info: Optional[dict[str, object]] = None
+    try:
+        result = subprocess.run(
+            [
+                ffprobe_path,
+                "-v",
+                "error",
+                "-show_entries",
+                "stream=codec_type,codec_name,width,height,pix_fmt,r_frame_rate,sample_aspect_ratio,"
+                "sample_rate,channels,profile,level:stream_tags=rotate:stream_side_data_list",
+                "-of",
+                "json",
+                str(source),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        streams = json.loads(result.stdout).get("streams", [])
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        streams = None
+    if streams is not None:
+        video = next((item for item in streams if item.get("codec_type") == "video"), None)
+        audio = [item for item in streams if item.get("codec_type") == "audio"]
+        if video is not None:
+            info = {**video, "audio_streams": audio}
+    _STREAM_INFO_CACHE[key] = info
+    return info
+
+
+def is_mux_ready_audio(ffprobe_path: Optional[str], source: Path) -> bool:
+    """True when ``source`` is already the stereo 48 kHz AAC the final mux would encode."""
+    if not ffprobe_path:
+        return False
+    try:
+        result = subprocess.run(
+            [
+                ffprobe_path,
+                "-v",
+                "error",
+                "-select_streams",
+                "a:0",
+                "-show_entries",
+                "stream=codec_name,channels,sample_rate",
+                "-of",
+                "json",
+                str(source),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        streams = json.loads(result.stdout).get("streams", [])
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return False
+    return bool(streams) and (
+        streams[0].get("codec_name") == "aac"
+        and streams[0].get("channels") == 2
+        and str(streams[0].get("sample_rate")) == "48000"
+    )
+
+
+def x264_level(width: int, height: int, fps: int) -> int:
+    """Level x264 signals for ``width``x``height`` at ``fps`` (frame size and macroblock rate only)."""
+    frame_mbs = ((width + 15) // 16) * ((height + 15) // 16)
+    for level, max_frame_mbs, max_mbps in H264_LEVEL_LIMITS:
+        if frame_mbs <= max_frame_mbs and frame_mbs * fps <= max_mbps:
+            return level
+    return H264_LEVEL_LIMITS[-1][0]
+
+
+def _is_rotated(info: dict[str, object]) -> bool:
+    tags = info.get("tags") or {}
+    if str(tags.get("rotate", "0")) not in ("0", ""):
+        return True
+    return any(
+        float(item.get("rotation", 0) or 0) % 360 != 0 for item in info.get("side_data_list") or []
+    )
+
+
+def can_stream_copy(info: Optional[dict[str, object]], width: int, height: int, fps: int) -> bool:
+    """True when the source already matches what render_video_segment would encode.
+
+    The copied segment is joined with ``-c copy``, so it must also carry exactly one stereo
+    48 kHz AAC track and no rotation metadata like every re-encoded segment.
+    """
+    if not info:
+        return False
+    try:
+        frame_rate = Fraction(str(info.get("r_frame_rate")))
+        level = int(info.get("level") or 0)
+        rotated = _is_rotated(info)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return False
+    audio = info.get("audio_streams") or []
+    return (
+        info.get("codec_name") == "h264"
+        and info.get("profile") in STREAM_COPY_PROFILES
+        and 0 < level <= x264_level(width, height, fps)
+        and info.get("pix_fmt") == "yuv420p"
+        and info.get("width") == width
+        and info.get("height") == height
+        and frame_rate == fps
+        and info.get("sample_aspect_ratio") in (None, "1:1", "0:1", "N/A")
+        and not rotated
+        and len(audio) == 1
+        and audio[0].get("codec_name") == "aac"
+        and str(audio[0].get("sample_rate")) == "48000"
+        and audio[0].get("channels") == 2
+    )
 
 
 def render_video_segment(
@@ -351,9 +799,37 @@ def render_video_segment(
     height: int,
     fps: int,
     ffmpeg_path: str,
+    ffprobe_path: Optional[str] = None,
 ) -> None:
     label = stv.infer_year_text(segment.source)
     debug_text = segment.source.name if stv.SHOW_FILENAME else None
+    if (
+        segment.overlay_text is None
+        and label is None
+        and debug_text is None
+        and can_stream_copy(probe_stream_info(ffprobe_path, segment.source), width, height, fps)
+    ):
+        stv.run_ffmpeg(
+            [
+                ffmpeg_path,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                str(segment.source),
+                "-map",
+                "0:v:0",
+                "-map",
+                "0:a?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                str(output_path),
+            ]
+        )
+        return
     filter_graph, filter_output = stv.build_media_filter_graph(
         width,
         height,
@@ -378,16 +854,14 @@ def render_video_segment(
         "0:a?",
         "-r",
         str(fps),
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
+        *stv.video_encoder_args(),
         "-c:a",
         "aac",
         "-b:a",
         "192k",
         "-movflags",
         "+faststart",
+        *stv.encoder_thread_args(),
         str(output_path),
     ]
     stv.run_ffmpeg(cmd)
@@ -427,6 +901,7 @@ def render_segment(
     ffmpeg_path: str,
     ffprobe_path: Optional[str],
     default_duration: float,
+    subtitles: Optional[Mapping[int, Optional[Path]]] = None,
 ) -> None:
     if segment.kind == "image":
         render_image_segment(
@@ -439,28 +914,55 @@ def render_segment(
             ffmpeg_path,
             ffprobe_path,
             default_duration,
+            subtitles,
         )
     elif segment.kind == "video":
-        render_video_segment(segment, output_path, width, height, fps, ffmpeg_path)
+        render_video_segment(segment, output_path, width, height, fps, ffmpeg_path, ffprobe_path)
     else:
         render_text_segment(segment, output_path, width, height, fps, ffmpeg_path)
 
 
-def next_versioned_path(base: Path) -> Path:
-    ensure_dir(base.parent)
-    stem = base.stem
-    suffix = base.suffix or ""
-    pattern = re.compile(rf"^{re.escape(stem)}-(\d+){re.escape(suffix)}$")
-    max_index = 0
-    for candidate in base.parent.glob(f"{stem}-*{suffix}"):
-        match = pattern.match(candidate.name)
-        if match:
-            try:
-                value = int(match.group(1))
-            except ValueError:
-                continue
-            max_index = max(max_index, value)
-    return base.parent / f"{stem}-{max_index + 1:03d}{suffix}"
+RenderUnit = List[tuple[SegmentInfo, Path]]
+
+
+def group_render_units(
+    pending: Sequence[tuple[SegmentInfo, Path]],
+    jobs: int,
+    batch_size: int,
+    batchable: Callable[[SegmentInfo], bool] = lambda segment: segment.kind == "image",
+) -> List[RenderUnit]:
+    """Split pending segments into units: batchable segments share batches, others render alone."""
+    images = [item for item in pending if batchable(item[0])]
+    units: List[RenderUnit] = [[item] for item in pending if not batchable(item[0])]
+    # Spread stills across the workers instead of filling one batch while others idle.
+    per_batch = max(1, min(batch_size, -(-len(images) // max(1, jobs))))
+    units.extend(images[start : start + per_batch] for start in range(0, len(images), per_batch))
+    return units
+
+
+def render_pending(
+    units: Sequence[RenderUnit],
+    jobs: int,
+    render: Callable[[RenderUnit], None],
+) -> Iterator[SegmentInfo]:
+    """Render units on up to ``jobs`` threads, yielding each segment as its unit completes."""
+    if jobs <= 1 or len(units) <= 1:
+        for unit in units:
+            render(unit)
+            yield from (segment for segment, _output in unit)
+        return
+
+    # Each job is an ffmpeg subprocess, so threads are enough to keep the cores busy.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(render, unit): unit for unit in units}
+        try:
+            for future in as_completed(futures):
+                future.result()
+                yield from (segment for segment, _output in futures[future])
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
 
 
 def concat_segments(
@@ -468,130 +970,111 @@ def concat_segments(
     output_path: Path,
     segments_dir: Path,
     ffmpeg_path: str,
+    concat_tool: str = "auto",
 ) -> None:
-    concat_path = segments_dir / "concat.txt"
-    with concat_path.open("w", encoding="utf-8") as handle:
-        for segment_file in segment_files:
-            handle.write(f"file '{segment_file.as_posix()}'\n")
-
+    if concat_tool != "ffmpeg" and output_path.suffix.lower() == ".mkv":
+        if concat.merge_with_mkvmerge(segment_files, output_path, stv.FFMPEG_DEBUG):
+            return
     cmd = [
         ffmpeg_path,
         "-hide_banner",
         "-loglevel",
         "error",
         "-y",
-        "-f",
-        "concat",
-        "-safe",
-        "0",
-        "-i",
-        str(concat_path),
+        *concat.joined_video_input(segment_files, segments_dir, concat_tool, stv.FFMPEG_DEBUG),
         "-c",
         "copy",
         str(output_path),
     ]
+    # joined.mkv stays with its stamp so the next export can reuse it (see joined_video_input).
     stv.run_ffmpeg(cmd)
 
 
-def mux_audio_tracks(
-    ffmpeg_path: str,
-    source_video: Path,
-    target_video: Path,
+def concat_duration(ffprobe_path: Optional[str], segment_files: Sequence[Path]) -> Optional[float]:
+    total = 0.0
+    with ThreadPoolExecutor() as executor:
+        for duration in executor.map(
+            lambda path: stv.probe_media_duration(ffprobe_path, path), segment_files
+        ):
+            if duration is None:
+                return None
+            total += duration
+    return total
+
+
+def concat_and_mux(
+    segment_files: Sequence[Path],
+    output_path: Path,
+    segments_dir: Path,
     audio_paths: Sequence[Path],
-    ffprobe_path: Optional[str],
-    video_duration: Optional[float],
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str] = None,
+    concat_tool: str = "auto",
 ) -> None:
+    """Concatenate segments and attach audio in one ffmpeg pass (video is stream-copied)."""
     existing_sources = [path for path in audio_paths if path.exists()]
     if not existing_sources:
-        shutil.copyfile(source_video, target_video)
+        concat_segments(segment_files, output_path, segments_dir, ffmpeg_path, concat_tool)
         return
 
     with tempfile.TemporaryDirectory() as tmp_dir_str:
-        tmp_dir = Path(tmp_dir_str)
-        combined_audio = tmp_dir / "combined_audio.m4a"
+        # Trimming only matters when several cues must fit the video, so skip the probes otherwise.
+        video_duration = (
+            concat_duration(ffprobe_path, segment_files)
+            if len(existing_sources) > 1 and ffprobe_path
+            else None
+        )
         adjusted_sources = stv._adjust_audio_tracks(
             ffmpeg_path,
             list(existing_sources),
             video_duration,
             ffprobe_path,
-            tmp_dir,
+            Path(tmp_dir_str),
         )
 
+        cmd: List[str] = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-fflags",
+            "+genpts",
+            *concat.joined_video_input(
+                segment_files, segments_dir, concat_tool, stv.FFMPEG_DEBUG
+            ),
+        ]
+        for source in adjusted_sources:
+            cmd.extend(["-i", str(source)])
+        audio_codec = ["aac", "-ac", "2", "-ar", "48000"]
         if len(adjusted_sources) == 1:
-            stv.run_ffmpeg(
-                [
-                    ffmpeg_path,
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-y",
-                    "-i",
-                    str(adjusted_sources[0]),
-                    "-c:a",
-                    "aac",
-                    "-ac",
-                    "2",
-                    "-ar",
-                    "48000",
-                    str(combined_audio),
-                ]
-            )
+            audio_map = "1:a:0"
+            if is_mux_ready_audio(ffprobe_path, adjusted_sources[0]):
+                audio_codec = ["copy"]
         else:
-            concat_cmd: List[str] = [
-                ffmpeg_path,
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-y",
-            ]
-            for source in adjusted_sources:
-                concat_cmd.extend(["-i", str(source)])
-            filter_inputs = "".join(f"[{idx}:a]" for idx in range(len(adjusted_sources)))
-            filter_complex = (
-                f"{filter_inputs}concat=n={len(adjusted_sources)}:v=0:a=1[aout]"
-            )
-            concat_cmd.extend(
+            filter_inputs = "".join(f"[{idx}:a]" for idx in range(1, len(adjusted_sources) + 1))
+            cmd.extend(
                 [
                     "-filter_complex",
-                    filter_complex,
-                    "-map",
-                    "[aout]",
-                    "-c:a",
-                    "aac",
-                    "-ac",
-                    "2",
-                    "-ar",
-                    "48000",
-                    str(combined_audio),
+                    f"{filter_inputs}concat=n={len(adjusted_sources)}:v=0:a=1[aout]",
                 ]
             )
-            stv.run_ffmpeg(concat_cmd)
-
-        tmp_video = tmp_dir / "with_audio.mp4"
-        stv.run_ffmpeg(
+            audio_map = "[aout]"
+        cmd.extend(
             [
-                ffmpeg_path,
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-y",
-                "-i",
-                str(source_video),
-                "-i",
-                str(combined_audio),
                 "-map",
                 "0:v:0",
                 "-map",
-                "1:a:0",
+                audio_map,
                 "-c:v",
                 "copy",
                 "-c:a",
-                "aac",
+                *audio_codec,
                 "-shortest",
-                str(tmp_video),
+                str(output_path),
             ]
         )
-        shutil.move(tmp_video, target_video)
+        stv.run_ffmpeg(cmd)
 
 
 def parse_args() -> argparse.Namespace:
@@ -628,6 +1111,28 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Force re-render of all segments.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help=(
+            "Number of segments to render in parallel "
+            "(default: config 'concurrent_renders', else half the CPU cores)."
+        ),
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=stv.ENCODER_CHOICES,
+        help="H.264 encoder for segments (default: config 'encoder', else auto-detect hardware).",
+    )
+    parser.add_argument(
+        "--preset",
+        help="libx264 preset for video clips; still slides always use ultrafast (default: config 'preset', else veryfast).",
+    )
+    parser.add_argument(
+        "--concat-tool",
+        choices=("auto", "ffmpeg", "mkvmerge"),
+        help="How to join segments: auto uses mkvmerge when installed (default: config 'concat_tool', else auto).",
+    )
     parser.add_argument(
         "--watch",
         action="store_true",
@@ -639,6 +1144,12 @@ def parse_args() -> argparse.Namespace:
         default=1.0,
         help="Polling interval in seconds when --watch is used without watchfiles (default: 1.0).",
     )
+    parser.add_argument(
+        "--debounce-ms",
+        type=int,
+        default=300,
+        help="With --watch, wait until files have been quiet this long before rebuilding (default: 300).",
+    )
     parser.add_argument(
         "--debug-filename",
         action="store_true",
@@ -647,28 +1158,14 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def collect_snapshot(paths: Iterable[Path]) -> Dict[Path, float]:
-    snapshot: Dict[Path, float] = {}
-    for path in paths:
-        try:
-            snapshot[path] = path.stat().st_mtime
-        except OSError:
-            snapshot[path] = -1.0
-    return snapshot
-
+def run_build(
+    args: argparse.Namespace, announce_audio: bool = True, skip_unchanged: bool = False
+) -> BuildContext:
+    """Render stale segments and export a new version.
 
-def diff_snapshot(old: Dict[Path, float], new: Dict[Path, float]) -> List[Path]:
-    changed: set[Path] = set()
-    for path, mtime in new.items():
-        if old.get(path) != mtime:
-            changed.add(path)
-    for path in old:
-        if path not in new:
-            changed.add(path)
-    return sorted(changed)
-
-
-def run_build(args: argparse.Namespace, announce_audio: bool = True) -> BuildContext:
+    With ``skip_unchanged`` (watch rebuilds), no new version is written when the segments
+    and audio are identical to the last export, e.g. after an editor touched a file.
+    """
     config = load_config(args.config)
     stv.configure_motion(config)
     keep_temp = stv._config_bool(config, "keep_temp", False)
@@ -706,7 +1203,8 @@ def run_build(args: argparse.Namespace, announce_audio: bool = True) -> BuildCon
     if not source_dir.exists():
         raise SystemExit(f"Source directory {source_dir} does not exist")
 
-    input_paths: Set[Path] = {args.config.resolve(), source_dir}
+    config_path = args.config.resolve()
+    input_paths: Set[Path] = {config_path, source_dir}
 
     base_output = (
         args.output if args.output else Path(config.get("output", "slideshow.mp4"))
@@ -725,19 +1223,17 @@ def run_build(args: argparse.Namespace, announce_audio: bool = True) -> BuildCon
     work_dir_root = Path(config.get("work_dir", "segments")).resolve()
     ensure_dir(work_dir_root)
 
-    watch_paths: Set[Path] = {args.config.resolve(), source_dir}
+    watch_paths: Set[Path] = {config_path, source_dir}
 
-    media_files = list_media(source_dir)
-    if not media_files:
-        print("No media files found; nothing to do.")
-        return BuildContext(watch_paths, input_paths)
-
-    plan = build_segment_plan(
-        media_files,
+    stat_cache = segment_cache.StatCache()
+    plan = cached_segment_plan(
+        source_dir,
         args.limit,
         duration_image,
         duration_overlay,
         duration_text,
+        args.force,
+        stat_cache,
     )
     if not plan:
         print("No convertible media files found.")
@@ -747,120 +1243,223 @@ def run_build(args: argparse.Namespace, announce_audio: bool = True) -> BuildCon
         segments_dir = args.segments_dir.resolve()
     else:
         segments_dir = work_dir_root / "segments"
-    if not keep_temp and not has_existing_output(base_output) and segments_dir.exists():
+    if not keep_temp and not versioning.has_existing_output(base_output) and segments_dir.exists():
         shutil.rmtree(segments_dir)
     ensure_dir(segments_dir)
     subtitles_root = segments_dir / "subtitles"
     ensure_dir(subtitles_root)
 
-    config_mtime = args.config.stat().st_mtime if args.config.exists() else time.time()
-    script_mtime = Path(stv.__file__).stat().st_mtime
-    additional_mtime = max(config_mtime, script_mtime)
+    manifest = {} if args.force else segment_cache.load_manifest(segments_dir)
+    stat_cache.scan(segments_dir)
+    renderer_sources = [Path(stv.__file__), Path(__file__), *Path(collage.__file__).parent.glob("*.py")]
+    shared_settings: dict[str, object] = {
+        "config": {
+            key: value for key, value in config.items() if key not in SEGMENT_NEUTRAL_CONFIG_KEYS
+        },
+        "font": stv.FONT_PATH,
+        "debug_filename": stv.SHOW_FILENAME,
+        "renderer": segment_cache.sources_hash(renderer_sources),
+    }
 
     ffmpeg_path = shutil.which("ffmpeg") or "ffmpeg"
     ffprobe_path = shutil.which("ffprobe")
+    encoder = stv.configure_encoder(
+        args.encoder or stv._config_str(config, "encoder", stv.DEFAULT_CONFIG["encoder"]),
+        ffmpeg_path,
+    )
+    # Segments from different encoders should not be mixed in one stream-copied concat.
+    shared_settings["encoder"] = encoder
+    stv.X264_PRESET = args.preset or stv._config_str(config, "preset", stv.DEFAULT_CONFIG["preset"])
+    shared_settings["preset"] = stv.X264_PRESET
 
-    force_rebuild = args.force or not has_existing_output(base_output)
+    force_rebuild = args.force or not versioning.has_existing_output(base_output)
     expected_segments: Set[Path] = set()
     segment_files: List[Path] = []
+    pending: List[tuple[SegmentInfo, Path]] = []
+    cache_dir = segments_dir / segment_cache.CACHE_DIR_NAME
+    content_keys: Dict[Path, str] = {}
 
     for segment in plan:
-        resolved_source = segment.source.resolve()
-        watch_paths.add(resolved_source)
-        input_paths.add(resolved_source)
-
-        resolved_overlays = [dep.resolve() for dep in segment.overlay_sources]
-        for resolved_dep in resolved_overlays:
-            watch_paths.add(resolved_dep)
-            input_paths.add(resolved_dep)
+        # Plan paths are built under the resolved source_dir, so they are canonical already.
+        watch_paths.add(segment.source)
+        input_paths.add(segment.source)
+        watch_paths.update(segment.overlay_sources)
+        input_paths.update(segment.overlay_sources)
 
         output_segment = segment_output_path(segments_dir, segment)
         expected_segments.add(output_segment)
         segment_files.append(output_segment)
 
         deps = list_dependencies(segment)
-        should_render = force_rebuild or needs_render(output_segment, deps, additional_mtime)
+        cmd_hash = segment_cache.settings_hash(segment_settings(segment, shared_settings))
+        stale = needs_render(output_segment, deps, cmd_hash, manifest, stat_cache)
+        entry = manifest.get(output_segment.name)
+        key = (
+            segment_cache.content_key(
+                (dep["sha256"] for dep in entry["deps"].values()),
+                segment_cache.settings_hash(
+                    content_settings(segment, shared_settings, fps, duration_image)
+                ),
+            )
+            if entry
+            else None
+        )
+        if key:
+            content_keys[output_segment] = key
+        if force_rebuild or stale:
+            if not args.force and key and segment_cache.fetch(cache_dir, key, output_segment):
+                continue
+            # Cached blobs share the inode, so never let ffmpeg rewrite the old file in place.
+            output_segment.unlink(missing_ok=True)
+            pending.append((segment, output_segment))
+        elif key:
+            segment_cache.store(cache_dir, key, output_segment)
+
+    jobs = max(
+        1,
+        args.jobs
+        or stv._config_int(config, "concurrent_renders", max(1, (os.cpu_count() or 1) // 2)),
+    )
+    batch_size = max(1, stv._config_int(config, "render_batch_size", DEFAULT_RENDER_BATCH_SIZE))
+    # Overlays are written up front so the render workers only have ffmpeg work left.
+    subtitles = {
+        segment.index: prepare_overlay_subtitle(segment, subtitles_root, width, height)
+        for segment, _output in pending
+        if segment.kind == "image"
+    }
+    render_args = (
+        subtitles_root,
+        width,
+        height,
+        fps,
+        ffmpeg_path,
+        ffprobe_path,
+        duration_image,
+        subtitles,
+    )
 
-        if should_render:
+    def _render(unit: RenderUnit) -> None:
+        if len(unit) > 1:
+            try:
+                render_image_batch(unit, *render_args)
+            except stv.FFMpegError:
+                # Retry the halves so one bad image costs a few smaller batches, not K processes.
+                half = len(unit) // 2
+                _render(unit[:half])
+                _render(unit[half:])
+            return
+        for segment, output_segment in unit:
+            render_segment(segment, output_segment, *render_args)
+
+    units = group_render_units(
+        pending,
+        jobs,
+        batch_size,
+        lambda segment: segment.kind == "image" and not is_plain_still(segment, fps, duration_image),
+    )
+    # A watch rebuild often has one stale segment; let it use every core instead of a 1/jobs share.
+    workers = min(jobs, len(units))
+    stv.FFMPEG_THREADS = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else None
+    pending_files = {output_segment for _segment, output_segment in pending}
+    joiner = concat.PrefixJoiner(
+        segment_files,
+        segments_dir,
+        ffmpeg_path,
+        stv.run_ffmpeg,
+        ready=[path for path in segment_files if path not in pending_files],
+    )
+    # The prefix join may start with the first render; even a failed build waits for it and
+    # removes prefix.part.
+    try:
+        for segment in render_pending(units, jobs, _render):
+            output_segment = segment_output_path(segments_dir, segment)
+            joiner.mark_ready(output_segment)
+            if output_segment in content_keys:
+                segment_cache.store(cache_dir, content_keys[output_segment], output_segment)
             if args.verbose:
                 extras = (
                     " + " + ", ".join(src.name for src in segment.overlay_sources)
                     if segment.overlay_sources
                     else ""
                 )
-                print(f"processing {segment.source.name}{extras}")
-            render_segment(
-                segment,
-                output_segment,
-                subtitles_root,
-                width,
-                height,
-                fps,
-                ffmpeg_path,
-                ffprobe_path,
-                duration_image,
-            )
+                print(f"processed {segment.source.name}{extras}")
 
-    for segment_file in segments_dir.glob("*.mp4"):
-        if segment_file not in expected_segments:
+        expected_names = {segment_file.name for segment_file in expected_segments}
+        with os.scandir(segments_dir) as entries:
+            present_names = {entry.name for entry in entries if entry.name.endswith(".mp4")}
+        for name in present_names - expected_names:
             try:
-                segment_file.unlink()
+                os.unlink(segments_dir / name)
             except OSError:
                 pass
+        segment_cache.save_manifest(
+            segments_dir, {name: entry for name, entry in manifest.items() if name in expected_names}
+        )
+        cache_cap_mb = stv._config_int(config, "segment_cache_max_mb", DEFAULT_SEGMENT_CACHE_MAX_MB)
+        segment_cache.prune(cache_dir, set(content_keys.values()), max(0, cache_cap_mb) * 1024 * 1024)
 
-    final_output = next_versioned_path(base_output)
-    intermediate_output = final_output.with_name(f"{final_output.stem}.video{final_output.suffix}")
-    build_succeeded = False
-    try:
-        if args.verbose:
-            print(f"concatenating into {intermediate_output.name}")
-        if intermediate_output.exists():
-            intermediate_output.unlink()
-        concat_segments(segment_files, intermediate_output, segments_dir, ffmpeg_path)
-        audio_paths = [Path(entry) for entry in config.get("audio_files", []) if entry]
-        audio_attached = not audio_paths
-        for audio in audio_paths:
-            resolved_audio = audio.resolve()
-            watch_paths.add(resolved_audio)
-            watch_paths.add(resolved_audio.parent)
-            input_paths.add(resolved_audio)
-            input_paths.add(resolved_audio.parent)
-        video_duration = stv.probe_media_duration(ffprobe_path, intermediate_output)
-        if audio_paths:
-            resolved, missing = stv.resolve_audio_files(audio_paths)
-            for missing_path in missing:
-                print(f"Warning: audio file {missing_path} not found; skipping.")
-            if resolved:
-                if announce_audio and args.verbose:
-                    resolved_list = ", ".join(path.as_posix() for path in resolved)
-                    print(f"using audio tracks: {resolved_list}")
-                mux_audio_tracks(ffmpeg_path, intermediate_output, final_output, resolved, ffprobe_path, video_duration)
-                audio_attached = True
-                resolved_parents = {path.resolve().parent for path in resolved}
-                watch_paths.update(path.resolve() for path in resolved)
-                watch_paths.update(resolved_parents)
-                input_paths.update(path.resolve() for path in resolved)
-                input_paths.update(resolved_parents)
+        final_output: Optional[Path] = None
+        build_succeeded = False
+        try:
+            audio_paths = [Path(entry) for entry in config.get("audio_files", []) if entry]
+            audio_attached = not audio_paths
+            for audio in audio_paths:
+                resolved_audio = audio.resolve()
+                watch_paths.add(resolved_audio)
+                watch_paths.add(resolved_audio.parent)
+                input_paths.add(resolved_audio)
+                input_paths.add(resolved_audio.parent)
+            resolved: List[Path] = []
+            if audio_paths:
+                resolved, missing = stv.resolve_audio_files(audio_paths)
+                for missing_path in missing:
+                    print(f"Warning: audio file {missing_path} not found; skipping.")
+                if resolved:
+                    if announce_audio and args.verbose:
+                        resolved_list = ", ".join(path.as_posix() for path in resolved)
+                        print(f"using audio tracks: {resolved_list}")
+                    audio_attached = True
+                    resolved_parents = {path.parent for path in resolved}
+                    watch_paths.update(resolved)
+                    watch_paths.update(resolved_parents)
+                    input_paths.update(resolved)
+                    input_paths.update(resolved_parents)
+            concat_tool = args.concat_tool or stv._config_str(config, "concat_tool", "auto")
+            export_signature = (
+                tuple((path, content_keys.get(path)) for path in segment_files),
+                tuple((path, path.stat().st_mtime_ns, path.stat().st_size) for path in resolved),
+                concat_tool,
+            )
+            if skip_unchanged and not args.force and _LAST_EXPORT.get(base_output) == export_signature:
+                print("no changes to segments or audio; keeping the previous output")
+                return BuildContext(watch_paths, input_paths)
+            final_output = versioning.next_versioned_path(base_output)
+            if args.verbose:
+                print(f"concatenating into {final_output.name}")
+            concat_and_mux(
+                joiner.finish(),
+                final_output,
+                segments_dir,
+                resolved,
+                ffmpeg_path,
+                ffprobe_path,
+                concat_tool,
+            )
+            if audio_attached:
+                print(f"generated {final_output.name}")
             else:
-                shutil.copyfile(intermediate_output, final_output)
-        else:
-            shutil.copyfile(intermediate_output, final_output)
-        if audio_attached:
-            print(f"generated {final_output.name}")
-        else:
-            print(f"generated {final_output.name} (audio missing)")
-        build_succeeded = True
+                print(f"generated {final_output.name} (audio missing)")
+            build_succeeded = True
+            _LAST_EXPORT[base_output] = export_signature
+        finally:
+            if not build_succeeded and final_output is not None and final_output.exists():
+                try:
+                    final_output.unlink()
+                except OSError:
+                    pass
     finally:
-        if not build_succeeded and final_output.exists():
-            try:
-                final_output.unlink()
-            except OSError:
-                pass
-        if not build_succeeded and intermediate_output.exists():
-            try:
-                intermediate_output.unlink()
-            except OSError:
-                pass
+        joiner.finish()
+        joiner.cleanup()
 
     return BuildContext(watch_paths, input_paths)
 
@@ -876,38 +1475,48 @@ def watch_loop(args: argparse.Namespace) -> None:
             print(f"using audio tracks: {resolved_list}")
 
     build_ctx = run_build(args, announce_audio=False)
-    watch_paths = build_ctx.watch_paths
-    input_paths = build_ctx.input_paths
-    snapshot: Dict[Path, float] = collect_snapshot(watch_paths)
-
+    debounce_ms = max(0, args.debounce_ms)
+    # File types whose changes can affect a build; anything else is dropped before it reaches us.
+    extensions = (
+        stv.IMAGE_EXTENSIONS | stv.VIDEO_EXTENSIONS | stv.TEXT_EXTENSIONS | stv.AUDIO_EXTENSIONS
+    )
     print("Watching for changes... Press Ctrl+C to stop.")
+    if not watch.has_native_events():
+        print(
+            f"Polling every {max(args.interval, 0.1)}s; "
+            "`python -m pip install watchfiles` for instant, idle-free change events."
+        )
+    events: Optional[Iterator[List[Path]]] = None
+    watched: Optional[BuildContext] = None
     try:
         while True:
-            changed_paths: List[Path] = []
-            watch_dirs = {path if path.is_dir() else path.parent for path in watch_paths}
-            if watchfiles_watch is not None and watch_dirs:
-                for changes in watchfiles_watch(*{str(path) for path in watch_dirs}):
-                    changed_paths = sorted({Path(p) for _change, p in changes})
+            # One event source stays open across rebuilds, so edits saved mid-build are still
+            # delivered; only a build that changed the watched inputs needs a new one.
+            if events is None or build_ctx != watched:
+                if events is not None:
+                    events.close()
+                events = watch.event_source(
+                    build_ctx.watch_paths,
+                    build_ctx.input_paths,
+                    extensions,
+                    args.interval,
+                    debounce_ms,
+                )
+                watched = build_ctx
+            for changed_paths in events:
+                relevant_changes = watch.filter_relevant_changes(changed_paths, build_ctx.input_paths)
+                if relevant_changes:
                     break
             else:
-                while True:
-                    time.sleep(max(args.interval, 0.1))
-                    current = collect_snapshot(watch_paths)
-                    if current != snapshot:
-                        changed_paths = diff_snapshot(snapshot, current)
-                        snapshot = current
-                        break
-            relevant_changes = filter_relevant_changes(changed_paths, input_paths)
-            if not relevant_changes:
-                continue
+                return
             names = ", ".join(path.name for path in relevant_changes)
             print(f"detected change in {names}")
-            build_ctx = run_build(args, announce_audio=False)
-            watch_paths = build_ctx.watch_paths
-            input_paths = build_ctx.input_paths
-            snapshot = collect_snapshot(watch_paths)
+            build_ctx = run_build(args, announce_audio=False, skip_unchanged=True)
     except KeyboardInterrupt:
         print("\nStopped watching.")
+    finally:
+        if events is not None:
+            events.close()
 
 
 def main() -> None:
@@ -3,10 +3,28 @@
 from __future__ import annotations
 
 import math
+import os
 import subprocess
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Optional, Sequence, Tuple
 
+try:
+    import av  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    av = None
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+_AV_ERRORS: tuple[type[BaseException], ...] = (OSError, ValueError, IndexError) + (
+    (av.FFmpegError,) if av is not None else ()
+)
+
 VISUAL_EXTENSIONS = {
     ".jpg",
     ".jpeg",
@@ -27,26 +45,105 @@ VISUAL_EXTENSIONS = {
 }
 
 TEXT_EXTENSIONS = {".txt", ".pug"}
+# Still formats whose size PIL reads from the header alone (HEIC only with pillow-heif).
+HEADER_SIZE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".heic", ".heif"}
+
+# collect_assets_for results by (directory, prefix) with the file names they were built from.
+_ASSET_RUNS: dict[tuple[str, str], tuple[list[str], tuple[list[Path], list[Path]]]] = {}
 
 
 def collect_assets(source_dir: Path, prefix: str) -> tuple[list[Path], list[Path]]:
+    # One scandir pass; DirEntry.is_file() answers from the listing, and only kept names become Paths.
+    with os.scandir(source_dir) as entries:
+        names = sorted(
+            entry.name
+            for entry in entries
+            if entry.name.startswith(prefix) and not entry.name.startswith(".") and entry.is_file()
+        )
     visuals: list[Path] = []
     overlays: list[Path] = []
-    for candidate in sorted(source_dir.glob(f"{prefix}*")):
-        if not candidate.is_file():
-            continue
-        suffix = candidate.suffix.lower()
-        stem = candidate.stem
+    for name in names:
+        stem, suffix = os.path.splitext(name)
         if not stem.startswith(prefix):
             continue
+        suffix = suffix.lower()
         if suffix in VISUAL_EXTENSIONS:
-            visuals.append(candidate)
+            visuals.append(source_dir / name)
         elif suffix in TEXT_EXTENSIONS:
-            overlays.append(candidate)
+            overlays.append(source_dir / name)
     return visuals, overlays
 
 
+def collect_assets_for(
+    source_dir: Path, prefixes: Iterable[str]
+) -> dict[str, tuple[list[Path], list[Path]]]:
+    """``collect_assets`` for many prefixes at once, from a single directory scan.
+
+    Names starting with a prefix form one contiguous run of the sorted listing, so each
+    prefix costs a bisect instead of another glob over the whole directory.
+    """
+    with os.scandir(source_dir) as entries:
+        # glob skips dot files, so do the same here.
+        names = sorted(
+            entry.name for entry in entries if not entry.name.startswith(".") and entry.is_file()
+        )
+    directory = os.fspath(source_dir)
+    assets: dict[str, tuple[list[Path], list[Path]]] = {}
+    for prefix in prefixes:
+        start = end = bisect_left(names, prefix)
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+        run = names[start:end]
+        # Reuse the Path objects of an unchanged run; building Paths dominates large rescans.
+        cached = _ASSET_RUNS.get((directory, prefix))
+        if cached and cached[0] == run:
+            assets[prefix] = cached[1]
+            continue
+        visuals: list[Path] = []
+        overlays: list[Path] = []
+        for name in run:
+            stem, suffix = os.path.splitext(name)
+            if not stem.startswith(prefix):
+                continue
+            suffix = suffix.lower()
+            if suffix in VISUAL_EXTENSIONS:
+                visuals.append(source_dir / name)
+            elif suffix in TEXT_EXTENSIONS:
+                overlays.append(source_dir / name)
+        assets[prefix] = (visuals, overlays)
+        _ASSET_RUNS[(directory, prefix)] = (run, assets[prefix])
+    return assets
+
+
 def probe_dimensions(path: Path, ffprobe_path: Optional[str]) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _probe_dimensions(os.fspath(path), stat.st_mtime_ns, stat.st_size, ffprobe_path)
+
+
+@lru_cache(maxsize=4096)
+def _probe_dimensions(
+    path_str: str, _mtime_ns: int, _size: int, ffprobe_path: Optional[str]
+) -> Optional[tuple[int, int]]:
+    # Size and mtime are only part of the key, so an edited file is probed again.
+    path = Path(path_str)
+    if Image is not None and path.suffix.lower() in HEADER_SIZE_EXTENSIONS:
+        try:
+            with Image.open(path) as img:
+                return img.size
+        except (OSError, ValueError):
+            pass  # e.g. HEIC without pillow-heif; ffprobe may still read it
+    if av is not None:
+        # Opening the container in-process reads the same stream header without an ffprobe spawn.
+        try:
+            with av.open(path_str) as container:
+                context = container.streams.video[0].codec_context
+                if context.width and context.height:
+                    return context.width, context.height
+        except _AV_ERRORS:
+            pass
     if not ffprobe_path:
         return None
     try:
@@ -80,8 +177,30 @@ def probe_dimensions(path: Path, ffprobe_path: Optional[str]) -> Optional[tuple[
     return width, height
 
 
+def probe_dimensions_bulk(
+    paths: Sequence[Path], ffprobe_path: Optional[str]
+) -> list[Optional[tuple[int, int]]]:
+    """``probe_dimensions`` for every path, with any ffprobe processes running side by side."""
+    # Stills are answered from their headers in microseconds; only clips are worth a thread.
+    slow = [
+        path
+        for path in paths
+        if Image is None or path.suffix.lower() not in HEADER_SIZE_EXTENSIONS
+    ]
+    if not ffprobe_path or len(slow) < 2:
+        return [probe_dimensions(path, ffprobe_path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(8, len(slow))) as executor:
+        probed = dict(zip(slow, executor.map(lambda path: probe_dimensions(path, ffprobe_path), slow)))
+    return [
+        probed[path] if path in probed else probe_dimensions(path, ffprobe_path) for path in paths
+    ]
+
+
 def classify_orientation(path: Path, ffprobe_path: Optional[str]) -> str:
-    dims = probe_dimensions(path, ffprobe_path)
+    return _orientation(probe_dimensions(path, ffprobe_path))
+
+
+def _orientation(dims: Optional[tuple[int, int]]) -> str:
     if not dims:
         return "unknown"
     width, height = dims
@@ -167,7 +286,7 @@ def build_collage(
         raise ValueError("Collage requires at least two images")
 
     padding_value = padding if padding is not None else max(20, min(width, height) // 40)
-    orientations = [classify_orientation(path, ffprobe_path) for path in images]
+    orientations = [_orientation(dims) for dims in probe_dimensions_bulk(images, ffprobe_path)]
 
     if len(images) == 2:
         cols, rows = 2, 1
@@ -0,0 +1,182 @@
+"""Joining rendered segments: concat lists, mkvmerge appends, and the background prefix join."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Set
+
+from . import segment_cache
+
+
+class ConcatError(RuntimeError):
+    pass
+
+
+def write_concat_list(
+    segment_files: Sequence[Path], segments_dir: Path, name: str = "concat.txt"
+) -> Path:
+    concat_path = segments_dir / name
+    # Inside the demuxer's single quotes a literal quote is written as '\''.
+    payload = "".join(
+        [
+            "file '" + segment_file.as_posix().replace("'", "'\\''") + "'\n"
+            for segment_file in segment_files
+        ]
+    )
+    concat_path.write_bytes(payload.encode("utf-8"))
+    return concat_path
+
+
+def merge_with_mkvmerge(
+    segment_files: Sequence[Path], output_path: Path, debug: bool = False
+) -> bool:
+    """Append the segments into one Matroska file; False if mkvmerge is missing or fails."""
+    mkvmerge_path = shutil.which("mkvmerge")
+    if not mkvmerge_path or not segment_files:
+        return False
+    cmd = [mkvmerge_path, "--quiet", "-o", str(output_path), str(segment_files[0])]
+    for segment_file in segment_files[1:]:
+        cmd.extend(["+", str(segment_file)])
+    if debug:
+        print("Running:", " ".join(cmd))
+    # mkvmerge exits with 1 for warnings (the file is still written) and 2 for errors.
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode >= 2:
+        output_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def missing_segments(segment_files: Sequence[Path]) -> List[Path]:
+    """Segments not on disk, checked with one directory scan per parent instead of a stat each."""
+    present: Set[Path] = set()
+    for parent in {segment_file.parent for segment_file in segment_files}:
+        try:
+            with os.scandir(parent) as entries:
+                present.update(parent / entry.name for entry in entries)
+        except OSError:
+            pass
+    return [segment_file for segment_file in segment_files if segment_file not in present]
+
+
+def joined_video_input(
+    segment_files: Sequence[Path],
+    segments_dir: Path,
+    concat_tool: str = "auto",
+    debug: bool = False,
+) -> List[str]:
+    """ffmpeg input arguments that yield the segments back to back.
+
+    With mkvmerge the segments are appended into ``segments_dir/joined.mkv`` first, which
+    avoids ffmpeg's concat demuxer re-reading every segment's moov atom. The join is kept
+    with a stamp of the segments it holds, so an export that only changes the audio reuses it.
+    """
+    missing = missing_segments(segment_files)
+    if missing:
+        names = ", ".join(path.name for path in missing)
+        raise ConcatError(f"cannot concatenate, missing segment(s): {names}")
+    if concat_tool != "ffmpeg":
+        joined = segments_dir / "joined.mkv"
+        stamp_path = segments_dir / "joined.stamp"
+        stamp = segment_cache.settings_hash(
+            [(str(path), path.stat().st_size, path.stat().st_mtime_ns) for path in segment_files]
+        )
+        try:
+            if joined.exists() and stamp_path.read_text(encoding="utf-8") == stamp:
+                return ["-i", str(joined)]
+        except OSError:
+            pass
+        stamp_path.unlink(missing_ok=True)
+        if merge_with_mkvmerge(segment_files, joined, debug):
+            stamp_path.write_text(stamp, encoding="utf-8")
+            return ["-i", str(joined)]
+        if concat_tool == "mkvmerge":
+            raise ConcatError("mkvmerge is not available or failed to join the segments")
+    concat_path = write_concat_list(segment_files, segments_dir)
+    return ["-f", "concat", "-safe", "0", "-i", str(concat_path)]
+
+
+class PrefixJoiner:
+    """Stream-copies the leading run of finished segments while later ones still encode.
+
+    The concat demuxer reads its list up front, so it cannot follow a growing file; instead,
+    once half of the segments form a contiguous ready prefix, that prefix is joined into
+    ``segments_dir/prefix.part`` on a background thread and the final concat only has to
+    append the tail to it. ``run`` executes an ffmpeg command and raises on failure.
+    """
+
+    def __init__(
+        self,
+        segment_files: Sequence[Path],
+        segments_dir: Path,
+        ffmpeg_path: str,
+        run: Callable[[List[str]], None],
+        ready: Iterable[Path] = (),
+    ) -> None:
+        self.segment_files = list(segment_files)
+        self.segments_dir = segments_dir
+        self.ffmpeg_path = ffmpeg_path
+        self.run = run
+        self.head_path = segments_dir / "prefix.part"
+        self._ready: Set[Path] = set(ready)
+        self._prefix = 0
+        self._joined = 0
+        self._thread: Optional[threading.Thread] = None
+        self._advance()
+
+    def mark_ready(self, segment_file: Path) -> None:
+        self._ready.add(segment_file)
+        self._advance()
+
+    def _advance(self) -> None:
+        while self._prefix < len(self.segment_files) and self.segment_files[self._prefix] in self._ready:
+            self._prefix += 1
+        # Joining is only worth it while there is still encoding left to overlap with.
+        if self._thread is None and 2 <= self._prefix < len(self.segment_files) and (
+            self._prefix * 2 >= len(self.segment_files)
+        ):
+            self._thread = threading.Thread(target=self._join, args=(self._prefix,), daemon=True)
+            self._thread.start()
+
+    def _join(self, count: int) -> None:
+        concat_path = write_concat_list(self.segment_files[:count], self.segments_dir, "prefix.txt")
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-nostdin",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_path),
+            "-c",
+            "copy",
+            "-f",
+            "mp4",
+            str(self.head_path),
+        ]
+        try:
+            self.run(cmd)
+        except (RuntimeError, OSError):
+            self.head_path.unlink(missing_ok=True)
+            return
+        self._joined = count
+
+    def finish(self) -> List[Path]:
+        """Wait for the background join and return the files the final concat should read."""
+        if self._thread is not None:
+            self._thread.join()
+        if not self._joined:
+            return self.segment_files
+        return [self.head_path, *self.segment_files[self._joined :]]
+
+    def cleanup(self) -> None:
+        self.head_path.unlink(missing_ok=True)
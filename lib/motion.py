@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from typing import Optional, Sequence
 
@@ -48,40 +49,37 @@ def select_motion(
     return _plan_for_effect(effect, duration, fps)
 
 
+_BASE_ZOOM = 1.045
+_MEDIUM_ZOOM = 1.055
+_GENTLE_SHIFT = 0.35  # fraction of available margin (0..1)
+_DIAGONAL_SHIFT = 0.25
+
+# (zoom_start, zoom_end, offset_x_start, offset_x_end, offset_y_start, offset_y_end) per effect.
+_EFFECT_TABLE: dict[str, tuple[float, float, float, float, float, float]] = {
+    "zoom_in": (1.0, _BASE_ZOOM, 0.0, 0.0, 0.0, 0.0),
+    "zoom_out": (_BASE_ZOOM, 1.0, 0.0, 0.0, 0.0, 0.0),
+    "pan_right": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, -_GENTLE_SHIFT, _GENTLE_SHIFT, 0.0, 0.0),
+    "pan_left": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, _GENTLE_SHIFT, -_GENTLE_SHIFT, 0.0, 0.0),
+    "pan_up": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, 0.0, 0.0, _GENTLE_SHIFT, -_GENTLE_SHIFT),
+    "pan_down": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, 0.0, 0.0, -_GENTLE_SHIFT, _GENTLE_SHIFT),
+    "pan_diag_up_right": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, -_DIAGONAL_SHIFT, _DIAGONAL_SHIFT, _DIAGONAL_SHIFT, -_DIAGONAL_SHIFT),
+    "pan_diag_down_left": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, _DIAGONAL_SHIFT, -_DIAGONAL_SHIFT, -_DIAGONAL_SHIFT, _DIAGONAL_SHIFT),
+    "pan_diag_up_left": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, _DIAGONAL_SHIFT, -_DIAGONAL_SHIFT, _DIAGONAL_SHIFT, -_DIAGONAL_SHIFT),
+    "pan_diag_down_right": (_MEDIUM_ZOOM, _MEDIUM_ZOOM, -_DIAGONAL_SHIFT, _DIAGONAL_SHIFT, -_DIAGONAL_SHIFT, _DIAGONAL_SHIFT),
+}
+
+
 def _plan_for_effect(effect: str, duration: float, fps: int) -> Optional[MotionPlan]:
-    base_zoom = 1.045
-    medium_zoom = 1.055
-    gentle_shift = 0.35  # fraction of available margin (0..1)
-    diagonal_shift = 0.25
-
-    if effect == "zoom_in":
-        return MotionPlan(effect, 1.0, base_zoom, 0.0, 0.0, 0.0, 0.0, duration, fps)
-    if effect == "zoom_out":
-        return MotionPlan(effect, base_zoom, 1.0, 0.0, 0.0, 0.0, 0.0, duration, fps)
-    if effect == "pan_right":
-        return MotionPlan(effect, medium_zoom, medium_zoom, -gentle_shift, gentle_shift, 0.0, 0.0, duration, fps)
-    if effect == "pan_left":
-        return MotionPlan(effect, medium_zoom, medium_zoom, gentle_shift, -gentle_shift, 0.0, 0.0, duration, fps)
-    if effect == "pan_up":
-        return MotionPlan(effect, medium_zoom, medium_zoom, 0.0, 0.0, gentle_shift, -gentle_shift, duration, fps)
-    if effect == "pan_down":
-        return MotionPlan(effect, medium_zoom, medium_zoom, 0.0, 0.0, -gentle_shift, gentle_shift, duration, fps)
-    if effect == "pan_diag_up_right":
-        return MotionPlan(effect, medium_zoom, medium_zoom, -diagonal_shift, diagonal_shift, diagonal_shift, -diagonal_shift, duration, fps)
-    if effect == "pan_diag_down_left":
-        return MotionPlan(effect, medium_zoom, medium_zoom, diagonal_shift, -diagonal_shift, -diagonal_shift, diagonal_shift, duration, fps)
-    if effect == "pan_diag_up_left":
-        return MotionPlan(effect, medium_zoom, medium_zoom, diagonal_shift, -diagonal_shift, diagonal_shift, -diagonal_shift, duration, fps)
-    if effect == "pan_diag_down_right":
-        return MotionPlan(effect, medium_zoom, medium_zoom, -diagonal_shift, diagonal_shift, -diagonal_shift, diagonal_shift, duration, fps)
-    # Fallback
-    return MotionPlan(effect, 1.0, base_zoom, 0.0, 0.0, 0.0, 0.0, duration, fps)
+    # Unknown effects fall back to a gentle zoom in.
+    params = _EFFECT_TABLE.get(effect, _EFFECT_TABLE["zoom_in"])
+    return MotionPlan(effect, *params, duration, fps)
 
 
 def build_motion_filter(plan: MotionPlan, width: int, height: int) -> Optional[str]:
     total_frames = max(int(round(plan.duration * plan.fps)), 1)
     progress_frames = max(total_frames - 1, 1)
-    progress_expr = f"if(gte(on,{progress_frames}),1,(1-cos(PI*on/{progress_frames}))/(2))"
+    # PI/N is folded into one constant so each frame costs a multiply and a cos, not a division too.
+    progress_expr = f"if(gte(on,{progress_frames}),1,(1-cos(on*{math.pi / progress_frames!r}))/2)"
 
     zoom_delta = plan.zoom_end - plan.zoom_start
     if abs(zoom_delta) < 1e-4:
@@ -98,11 +96,16 @@ def build_motion_filter(plan: MotionPlan, width: int, height: int) -> Optional[s
         body = f"{start:.6f} + ({delta:.6f})*{progress_expr}"
         return f"{body}"
 
-    offset_x_expr = _offset_expression(plan.offset_x_start, plan.offset_x_end)
-    offset_y_expr = _offset_expression(plan.offset_y_start, plan.offset_y_end)
+    def _position_expression(size: str, frame_size: int, offset_expr: str) -> str:
+        margin = f"{size}*zoom-{frame_size}"
+        if offset_expr == "0":
+            return f"({margin})/2"
+        # zoompan gives each of z/x/y its own st()/ld() slots, so the margin is shared only within
+        # this expression; the easing cannot be handed from one axis to the next.
+        return f"st(0,{margin});ld(0)/2 + ({offset_expr})*ld(0)"
 
-    x_expr = f"(iw*zoom-{width})/2 + ({offset_x_expr})*(iw*zoom-{width})"
-    y_expr = f"(ih*zoom-{height})/2 + ({offset_y_expr})*(ih*zoom-{height})"
+    x_expr = _position_expression("iw", width, _offset_expression(plan.offset_x_start, plan.offset_x_end))
+    y_expr = _position_expression("ih", height, _offset_expression(plan.offset_y_start, plan.offset_y_end))
 
     return (
         "zoompan="
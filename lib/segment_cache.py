@@ -0,0 +1,172 @@
+"""Content-hash manifest used to decide which cached segments are stale."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional, Set, Union
+
+MANIFEST_NAME = "manifest.json"
+# Rendered segments by content key, so reordering slides reuses them under new names.
+CACHE_DIR_NAME = "cache"
+# Empty file per blob whose mtime records the last cache hit, for least-recently-used pruning.
+USED_SUFFIX = ".used"
+
+
+def load_manifest(segments_dir: Path) -> dict[str, dict]:
+    try:
+        with (segments_dir / MANIFEST_NAME).open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_manifest(segments_dir: Path, manifest: dict[str, dict]) -> None:
+    # Write beside the target and swap it in so an interrupted build never leaves half a file.
+    target = segments_dir / MANIFEST_NAME
+    tmp_path = target.with_suffix(".json.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=1, sort_keys=True)
+    os.replace(tmp_path, target)
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class StatCache:
+    """Memoises ``os.stat`` results for the duration of one build."""
+
+    def __init__(self) -> None:
+        self._results: dict[Path, Union[os.stat_result, OSError]] = {}
+
+    def stat(self, path: Path) -> os.stat_result:
+        result = self._results.get(path)
+        if result is None:
+            try:
+                result = os.stat(path)
+            except OSError as exc:
+                result = exc
+            self._results[path] = result
+        if isinstance(result, OSError):
+            raise result
+        return result
+
+    def scan(self, directory: Path) -> dict[str, os.stat_result]:
+        """Stat every entry of ``directory`` in one listing and remember the results."""
+        stats: dict[str, os.stat_result] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    stats[entry.name] = entry.stat()
+                except OSError:
+                    continue
+                self._results[Path(entry.path)] = stats[entry.name]
+        return stats
+
+    def exists(self, path: Path) -> bool:
+        try:
+            self.stat(path)
+        except OSError:
+            return False
+        return True
+
+
+def fingerprint(path: Path, cached: Optional[dict], stat_cache: Optional[StatCache] = None) -> dict:
+    """Return size/mtime/sha256 for ``path``, reusing the cached hash when size and mtime match.
+
+    Integer nanosecond mtimes survive the JSON round trip exactly, unlike float seconds.
+    """
+    stat = stat_cache.stat(path) if stat_cache else path.stat()
+    if cached and cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+        return cached
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def settings_hash(settings: object) -> str:
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def sources_hash(paths: Iterable[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def content_key(dep_hashes: Iterable[str], settings_digest: str) -> str:
+    digest = hashlib.sha256(settings_digest.encode("utf-8"))
+    for dep_hash in dep_hashes:
+        digest.update(dep_hash.encode("ascii"))
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def fetch(cache_dir: Path, key: str, target: Path) -> bool:
+    """Hard-link the cached render for ``key`` to ``target``; False on a cache miss."""
+    blob = cache_dir / f"{key}.mp4"
+    if not blob.exists():
+        return False
+    link_or_copy(blob, target)
+    # Recency goes on a sidecar: the blob shares its inode (and mtime) with the linked segment,
+    # and touching it would invalidate every mtime-based stamp on the segments.
+    blob.with_suffix(USED_SUFFIX).touch()
+    return True
+
+
+def store(cache_dir: Path, key: str, source: Path) -> None:
+    blob = cache_dir / f"{key}.mp4"
+    if blob.exists():
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = blob.with_suffix(".tmp")
+    link_or_copy(source, tmp_path)
+    os.replace(tmp_path, blob)
+
+
+def prune(cache_dir: Path, keep: Set[str], max_bytes: int) -> None:
+    """Delete least recently used blobs not in ``keep`` until the cache fits ``max_bytes``."""
+    try:
+        with os.scandir(cache_dir) as entries:
+            listing = [(entry, entry.stat()) for entry in entries]
+    except FileNotFoundError:
+        return
+    used = {
+        entry.name[: -len(USED_SUFFIX)]: stat.st_mtime_ns
+        for entry, stat in listing
+        if entry.name.endswith(USED_SUFFIX)
+    }
+    blobs = [(entry, stat) for entry, stat in listing if entry.name.endswith(".mp4")]
+    total = sum(stat.st_size for _entry, stat in blobs)
+    # A blob never fetched since it was stored ranks by its store time.
+    for entry, stat in sorted(
+        blobs, key=lambda item: used.get(item[0].name[: -len(".mp4")], item[1].st_mtime_ns)
+    ):
+        if total <= max_bytes:
+            break
+        key = entry.name[: -len(".mp4")]
+        if key in keep:
+            continue
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            continue
+        total -= stat.st_size
+        try:
+            os.unlink(os.path.join(cache_dir, key + USED_SUFFIX))
+        except OSError:
+            pass
@@ -0,0 +1,115 @@
+"""Encode plain still slides in-process with PyAV instead of spawning ffmpeg."""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from pathlib import Path
+from typing import Optional
+
+try:
+    import av  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    av = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+AUDIO_RATE = 48000
+AUDIO_FRAME_SAMPLES = 1024  # AAC frame size
+# Failures that should send the caller back to the ffmpeg path (unreadable image, codec missing).
+ENCODE_ERRORS: tuple[type[BaseException], ...] = (OSError, ValueError) + (
+    (av.FFmpegError,) if av is not None else ()
+)
+
+
+def available() -> bool:
+    return av is not None and np is not None and Image is not None
+
+
+def fit_to_frame(path: Path, width: int, height: int) -> "np.ndarray":
+    """Scale to fit inside width x height and centre on black, like ffmpeg's scale+pad."""
+    with Image.open(path) as img:
+        rgb = img.convert("RGB")
+    scale = min(width / rgb.width, height / rgb.height)
+    size = (max(1, int(rgb.width * scale)), max(1, int(rgb.height * scale)))
+    if size != rgb.size:
+        rgb = rgb.resize(size, Image.BICUBIC)
+    canvas = Image.new("RGB", (width, height))
+    canvas.paste(rgb, ((width - size[0]) // 2, (height - size[1]) // 2))
+    return np.asarray(canvas)
+
+
+def encode_still(
+    image_path: Path,
+    output_path: Path,
+    duration: float,
+    fps: int,
+    width: int,
+    height: int,
+    threads: Optional[int] = None,
+) -> None:
+    """Write an H.264/AAC mp4 showing ``image_path`` for ``duration`` seconds over silence."""
+    pixels = fit_to_frame(image_path, width, height)
+    with av.open(str(output_path), "w", options={"movflags": "+faststart"}) as container:
+        video = container.add_stream("libx264", rate=fps)
+        video.width = width
+        video.height = height
+        video.pix_fmt = "yuv420p"
+        # Same settings as the ffmpeg path uses for a held frame.
+        video.options = {"preset": "ultrafast", "tune": "stillimage"}
+        video.codec_context.gop_size = fps * 2
+        if threads:
+            video.codec_context.thread_count = threads
+        audio = container.add_stream("aac", rate=AUDIO_RATE)
+        audio.layout = "stereo"
+        audio.bit_rate = 192000
+
+        # Every frame is identical, so convert to yuv420p once and only bump the timestamp.
+        frame = av.VideoFrame.from_ndarray(pixels, format="rgb24").reformat(format="yuv420p")
+        frame.time_base = Fraction(1, fps)
+        frame_count = max(1, round(duration * fps))
+        gop_size = video.codec_context.gop_size
+        first_gop = []
+        for index in range(min(frame_count, gop_size)):
+            frame.pts = index
+            first_gop.extend(video.encode(frame))
+        first_gop.extend(video.encode())
+        encoded = [
+            (bytes(packet), packet.pts, packet.dts, packet.duration, packet.is_keyframe, packet.time_base)
+            for packet in first_gop
+        ]
+        if len(encoded) != min(frame_count, gop_size) or any(pts != dts for _, pts, dts, *_ in encoded):
+            raise ValueError("encoder reordered frames; cannot replay the first GOP")
+        container.mux(first_gop)
+        # ultrafast has no B-frames and x264 GOPs are closed, so every later GOP of an unchanging
+        # picture is the first one again with shifted timestamps; only one GOP is ever encoded.
+        for offset in range(gop_size, frame_count, gop_size):
+            for data, pts, dts, length, keyframe, time_base in encoded[: frame_count - offset]:
+                packet = av.Packet(data)
+                packet.pts = pts + offset
+                packet.dts = dts + offset
+                packet.duration = length
+                packet.is_keyframe = keyframe
+                packet.time_base = time_base
+                packet.stream = video
+                container.mux(packet)
+
+        silence = np.zeros((2, AUDIO_FRAME_SAMPLES), dtype=np.float32)
+        total_samples = round(duration * AUDIO_RATE)
+        position = 0
+        while position < total_samples:
+            count = min(AUDIO_FRAME_SAMPLES, total_samples - position)
+            chunk = av.AudioFrame.from_ndarray(silence[:, :count], format="fltp", layout="stereo")
+            chunk.sample_rate = AUDIO_RATE
+            chunk.time_base = Fraction(1, AUDIO_RATE)
+            chunk.pts = position
+            container.mux(audio.encode(chunk))
+            position += count
+        container.mux(audio.encode())
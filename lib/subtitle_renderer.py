@@ -1,19 +1,47 @@
 from __future__ import annotations
 
+import io
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from PIL import ImageFont
 
 from . import text_renderer
-from .text_utils import TextLayout, is_rtl_text
+from .text_utils import LineInfo, TextLayout, is_rtl_text
+
+
+# Everything before the first dialogue; only the frame size, font and body size vary.
+_ASS_HEADER_TEMPLATE = "\n".join(
+    [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        "PlayResX: {width}",
+        "PlayResY: {height}",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        (
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+            "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
+            "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, "
+            "MarginL, MarginR, MarginV, Encoding"
+        ),
+        (
+            "Style: Overlay,{font_name},{body_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H64000000,"
+            "0,0,0,0,100,100,0,0,1,3,0,8,40,120,80,0"
+        ),
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+)
+# Characters ASS would treat as markup or line breaks.
+_ASS_ESCAPES = str.maketrans({"\\": r"\\", "{": r"\{", "}": r"\}", "\n": r"\N"})
 
 
 def _escape_ass_text(text: str) -> str:
-    escaped = text.replace("\\", r"\\")
-    escaped = escaped.replace("{", r"\{")
-    escaped = escaped.replace("}", r"\}")
-    return escaped.replace("\n", r"\N")
+    return text.translate(_ASS_ESCAPES)
 
 
 def _format_ass_time(duration: Optional[float]) -> str:
@@ -29,7 +57,9 @@ def _format_ass_time(duration: Optional[float]) -> str:
     return f"{hours}:{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
 
 
+@lru_cache(maxsize=None)
 def _resolve_font_name(font_path: Optional[Path]) -> str:
+    # Loading the font only to read its family name is the costliest step of a subtitle.
     if font_path and font_path.exists():
         try:
             font = ImageFont.truetype(str(font_path), size=64)
@@ -79,7 +109,18 @@ def create_ass_subtitle(
     end_time = _format_ass_time(duration)
     line_height = _line_height()
 
-    dialogues: list[str] = []
+    buffer = io.StringIO()
+    buffer.write(
+        _ASS_HEADER_TEMPLATE.format(
+            width=width,
+            height=height,
+            font_name=font_name,
+            body_size=text_renderer.BODY_FONT_SIZE,
+        )
+    )
+    dialogue_prefix = f"\nDialogue: 0,0:00:00.00,{end_time},Overlay,,0,0,0,,"
+    # Dialogues go straight into the buffer after the header; only their count is kept.
+    dialogue_count = 0
 
     def add_dialogue(
         alignment: int,
@@ -89,6 +130,7 @@ def create_ass_subtitle(
         direction: Optional[str] = None,
         font_size: Optional[int] = None,
     ) -> None:
+        nonlocal dialogue_count
         if not text:
             return
         escaped = _escape_ass_text(text)
@@ -100,13 +142,18 @@ def create_ass_subtitle(
         if font_size:
             overrides.append(f"\\fs{font_size}")
         override_block = "".join(overrides)
-        dialogues.append(
-            f"Dialogue: 0,0:00:00.00,{end_time},Overlay,,0,0,0,,"
-            f"{{{override_block}}}{escaped}"
-        )
-
-    top_lines = [line for line in lines if line.align == "top" and line.display.strip()]
-    body_lines = [line for line in lines if line.align != "top"]
+        buffer.write(f"{dialogue_prefix}{{{override_block}}}{escaped}")
+        dialogue_count += 1
+
+    # One pass splits the lines, keeping each stripped display for the loops below.
+    top_lines: list[tuple[LineInfo, str]] = []
+    body_lines: list[tuple[LineInfo, str]] = []
+    for line in lines:
+        display = line.display.strip()
+        if line.align != "top":
+            body_lines.append((line, display))
+        elif display:
+            top_lines.append((line, display))
 
     if has_title:
         title_direction = "rtl" if is_rtl_text(layout.title) else "ltr"
@@ -126,7 +173,7 @@ def create_ass_subtitle(
     else:
         top_base_y = text_renderer.TOP_MARGIN
 
-    for index, line in enumerate(top_lines):
+    for index, (line, display) in enumerate(top_lines):
         y_pos = top_base_y + index * line_height
         line_text = line.text if line.text else line.display
         direction = "rtl" if is_rtl_text(line_text) else "ltr"
@@ -134,7 +181,7 @@ def create_ass_subtitle(
             9,
             width - text_renderer.RIGHT_MARGIN,
             y_pos,
-            line.display.strip(),
+            display,
             direction,
             text_renderer.BODY_FONT_SIZE,
         )
@@ -144,11 +191,11 @@ def create_ass_subtitle(
         body_start_y += 40
 
     current_y = body_start_y
-    for line in body_lines:
+    for line, display in body_lines:
         if line.kind == "blank":
             current_y += line_height
             continue
-        if not line.display.strip():
+        if not display:
             current_y += line_height
             continue
         align = line.align
@@ -169,40 +216,14 @@ def create_ass_subtitle(
             alignment,
             x_pos,
             current_y,
-            line.display.strip(),
+            display,
             direction,
             text_renderer.BODY_FONT_SIZE,
         )
         current_y += line_height
 
-    if not dialogues:
+    if not dialogue_count:
         raise ValueError("Cannot create ASS subtitle from empty layout.")
 
-    subtitle_contents = "\n".join(
-        [
-            "[Script Info]",
-            "ScriptType: v4.00+",
-            f"PlayResX: {width}",
-            f"PlayResY: {height}",
-            "ScaledBorderAndShadow: yes",
-            "",
-            "[V4+ Styles]",
-            (
-                "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
-                "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
-                "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, "
-                "MarginL, MarginR, MarginV, Encoding"
-            ),
-            (
-                f"Style: Overlay,{font_name},{text_renderer.BODY_FONT_SIZE},&H00FFFFFF,&H00FFFFFF,&H00000000,&H64000000,"
-                "0,0,0,0,100,100,0,0,1,3,0,8,40,120,80,0"
-            ),
-            "",
-            "[Events]",
-            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
-            *dialogues,
-        ]
-    )
-
-    subtitle_path.write_text(subtitle_contents, encoding="utf-8")
+    subtitle_path.write_text(buffer.getvalue(), encoding="utf-8")
     return subtitle_path
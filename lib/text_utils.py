@@ -1,44 +1,34 @@
 from __future__ import annotations
 
+import os
+import re
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List
 
 BULLET_PREFIXES = ("•", "-", "*")
 RTL_HEBREW_START = ord("\u0590")
 RTL_HEBREW_END = ord("\u05FF")
-
-
-def _normalize_indent(raw_line: str) -> str:
-    return raw_line.replace("\t", "  ")
-
-
-def _indent_level(raw_line: str) -> int:
-    normalized = _normalize_indent(raw_line)
-    leading = len(normalized) - len(normalized.lstrip(" "))
-    return leading // 2
-
-
-def _extract_bullet(text: str) -> tuple[bool, str]:
-    stripped = text.strip()
-    if not stripped:
-        return False, ""
-    for marker in BULLET_PREFIXES:
-        if stripped.startswith(marker):
-            remainder = stripped[len(marker) :].strip()
-            return True, remainder
-    return False, stripped
+# Indentation (tabs count as two spaces), an optional bullet marker, and the stripped body.
+_CONTENT_LINE = re.compile(
+    rf"(?P<indent>[ \t]*)\s*(?P<marker>[{re.escape(''.join(BULLET_PREFIXES))}])?\s*(?P<body>.*?)\s*"
+)
+_RTL_CHAR = re.compile(f"[{chr(RTL_HEBREW_START)}-{chr(RTL_HEBREW_END)}]")
+# Parsed layouts keyed by path; an entry is reused while the file's mtime and size match.
+_LAYOUT_CACHE: dict[str, tuple[tuple[int, int], "TextLayout"]] = {}
+# Combined overlay layouts keyed by the ordered overlay paths, checked against every file's stamp.
+_COMBINED_CACHE: dict[tuple[str, ...], tuple[tuple[tuple[int, int], ...], "TextLayout"]] = {}
 
 
 def _is_rtl(text: str) -> bool:
-    for char in text:
-        code = ord(char)
-        if RTL_HEBREW_START <= code <= RTL_HEBREW_END:
-            return True
-    return False
+    # The regex engine scans in C and stops at the first Hebrew character.
+    return _RTL_CHAR.search(text) is not None
 
 
+@lru_cache(maxsize=4096)
 def is_rtl_text(text: str) -> bool:
+    # Parsing a layout and writing its subtitle both ask about the same lines.
     return _is_rtl(text)
 
 
@@ -121,10 +111,11 @@ def load_text_layout(path: Path) -> TextLayout:
                 lines.append(LineInfo("top", 0, stripped, stripped, align="top"))
             continue
 
-        level = _indent_level(raw_line)
-        is_bullet, bullet_text = _extract_bullet(stripped)
-        if is_bullet:
-            text = bullet_text if bullet_text else "-"
+        match = _CONTENT_LINE.fullmatch(raw_line)
+        indent = match["indent"]
+        level = (len(indent) + indent.count("\t")) // 2
+        if match["marker"]:
+            text = match["body"] or "-"
             align = _line_alignment(text)
             if align == "right":
                 display = f"{text}\u00A0•"
@@ -132,9 +123,8 @@ def load_text_layout(path: Path) -> TextLayout:
                 display = f"•\u00A0{text}"
             lines.append(LineInfo("bullet", level, text, display, align=align))
         else:
-            display = stripped
             align = _line_alignment(stripped)
-            lines.append(LineInfo("text", level, stripped, display, align=align))
+            lines.append(LineInfo("text", level, stripped, stripped, align=align))
 
     if title is None and not any(line.text for line in lines if line.kind != "blank"):
         fallback = path.stem
@@ -148,21 +138,43 @@ def load_text_layout(path: Path) -> TextLayout:
     return layout
 
 
+def _stamp(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _layout_for(path: str, stamp: tuple[int, int]) -> TextLayout:
+    cached = _LAYOUT_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    layout = load_text_layout(Path(path))
+    _LAYOUT_CACHE[path] = (stamp, layout)
+    return layout
+
+
 def combine_overlay_texts(paths: Iterable[Path]) -> TextLayout:
+    keys = tuple(os.fspath(path) for path in paths)
+    stamps = tuple(_stamp(key) for key in keys)
+    cached = _COMBINED_CACHE.get(keys)
+    if cached and cached[0] == stamps:
+        return cached[1]
+
     combined_lines: List[LineInfo] = []
     title: str | None = None
     metadata: dict[str, str] = {}
-    for overlay_path in paths:
-        layout = load_text_layout(overlay_path)
+    for key, stamp in zip(keys, stamps):
+        layout = _layout_for(key, stamp)
         if title is None and layout.title:
             title = layout.title
-        for key, value in layout.metadata.items():
-            if key not in metadata and value:
-                metadata[key] = value
+        for meta_key, value in layout.metadata.items():
+            if meta_key not in metadata and value:
+                metadata[meta_key] = value
         for line in layout.lines:
             if line.kind == "blank":
                 continue
             if not line.display.strip():
                 continue
             combined_lines.append(line)
-    return TextLayout(title=title, lines=combined_lines, metadata=metadata)
+    combined = TextLayout(title=title, lines=combined_lines, metadata=metadata)
+    _COMBINED_CACHE[keys] = (stamps, combined)
+    return combined
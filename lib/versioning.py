@@ -0,0 +1,77 @@
+"""Versioned output names (``stem-NNN``) and the sidecar that remembers the last number."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def _version_index(name: str, stem: str, suffix: str) -> Optional[int]:
+    """N for a name of the form ``stem-N<suffix>``, else None (plain slicing, no regex)."""
+    prefix = f"{stem}-"
+    if len(name) <= len(prefix) + len(suffix):
+        return None
+    if not (name.startswith(prefix) and name.endswith(suffix)):
+        return None
+    middle = name[len(prefix) : len(name) - len(suffix)]
+    if not (middle.isascii() and middle.isdigit()):
+        return None
+    return int(middle)
+
+
+def _max_version(base: Path) -> int:
+    stem = base.stem
+    suffix = base.suffix or ""
+    max_index = 0
+    with os.scandir(base.parent) as entries:
+        for entry in entries:
+            index = _version_index(entry.name, stem, suffix)
+            if index is not None and entry.is_file(follow_symlinks=False):
+                max_index = max(max_index, index)
+    return max_index
+
+
+def _version_counter_path(base: Path) -> Path:
+    return base.parent / f".{base.stem}.last_index"
+
+
+def _last_version_index(base: Path) -> Optional[int]:
+    try:
+        return int(_version_counter_path(base).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def next_versioned_path(base: Path) -> Path:
+    """Next ``stem-NNN`` path, tracked in a ``.stem.last_index`` sidecar to skip the directory scan."""
+    base.parent.mkdir(parents=True, exist_ok=True)
+    stem = base.stem
+    suffix = base.suffix or ""
+    last_index = _last_version_index(base)
+    candidate = last_index + 1 if last_index is not None else None
+    # Rescan when the sidecar is missing or a file already took its next number.
+    if candidate is None or (base.parent / f"{stem}-{candidate:03d}{suffix}").exists():
+        candidate = _max_version(base) + 1
+    # Swap the sidecar in whole so a reader never sees it half written.
+    counter_path = _version_counter_path(base)
+    tmp_path = counter_path.with_name(f"{counter_path.name}.tmp")
+    tmp_path.write_text(str(candidate), encoding="utf-8")
+    os.replace(tmp_path, counter_path)
+    return base.parent / f"{stem}-{candidate:03d}{suffix}"
+
+
+def has_existing_output(base: Path) -> bool:
+    if base.exists():
+        return True
+    stem = base.stem
+    suffix = base.suffix or ""
+    # The number next_versioned_path handed out last is usually still there: one stat, no scan.
+    last_index = _last_version_index(base)
+    if last_index is not None and (base.parent / f"{stem}-{last_index:03d}{suffix}").exists():
+        return True
+    try:
+        with os.scandir(base.parent) as entries:
+            return any(_version_index(entry.name, stem, suffix) is not None for entry in entries)
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,210 @@
+"""Change notification for watch mode: native file events when available, polling otherwise."""
+
+from __future__ import annotations
+
+import os
+import queue
+import time
+from pathlib import Path
+from typing import AbstractSet, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+try:
+    from watchfiles import watch as watchfiles_watch
+except ImportError:  # pragma: no cover - optional dependency
+    watchfiles_watch = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEventHandler = object  # type: ignore
+    Observer = None
+
+
+def is_within(path: Path, directory: Path) -> bool:
+    return path == directory or directory in path.parents
+
+
+def watch_roots(watch_paths: Iterable[Path]) -> Set[Path]:
+    """Directories to watch: watched dirs plus parents of watched files, without nested duplicates."""
+    dirs = {path if path.is_dir() else path.parent for path in watch_paths}
+    return {path for path in dirs if not any(other != path and is_within(path, other) for other in dirs)}
+
+
+def make_watch_filter(
+    input_paths: Set[Path], extensions: AbstractSet[str]
+) -> Callable[[object, str], bool]:
+    """Build a watchfiles filter passing inputs and ``extensions`` files under input directories."""
+    def _accept(_change: object, raw_path: str) -> bool:
+        path = Path(raw_path)
+        if path in input_paths:
+            return True
+        return path.suffix.lower() in extensions and under_input_dir(path, input_paths)
+
+    return _accept
+
+
+def under_input_dir(path: Path, input_paths: Set[Path]) -> bool:
+    """True when an ancestor of ``path`` is an input; only directories can be ancestors.
+
+    Set lookups on the parents replace an ``is_dir()`` stat of every input path.
+    """
+    return any(parent in input_paths for parent in path.parents)
+
+
+def filter_relevant_changes(changed_paths: Iterable[Path], input_paths: Set[Path]) -> List[Path]:
+    relevant: Set[Path] = set()
+    for raw_path in set(changed_paths):
+        # input_paths are already canonical (see incremental_builder.run_build). Watchers report
+        # absolute paths, so most events match as they are and only the rest pay for a resolve().
+        if raw_path in input_paths or (
+            ".." not in raw_path.parts and under_input_dir(raw_path, input_paths)
+        ):
+            relevant.add(raw_path)
+            continue
+        candidate = raw_path.resolve()
+        if candidate in input_paths or under_input_dir(candidate, input_paths):
+            relevant.add(candidate)
+    return sorted(relevant)
+
+
+def group_by_parent(paths: Iterable[Path]) -> Dict[Path, Set[str]]:
+    by_parent: Dict[Path, Set[str]] = {}
+    for path in paths:
+        by_parent.setdefault(path.parent, set()).add(path.name)
+    return by_parent
+
+
+def collect_snapshot(
+    by_parent: Mapping[Path, Set[str]]
+) -> Dict[str, Optional[tuple[int, int]]]:
+    """Map each watched path (grouped by ``group_by_parent``) to (mtime_ns, size), None if missing.
+
+    The size catches rewrites that keep the timestamp (``cp --preserve=timestamps``). Keys are
+    plain strings so a quiet poll tick builds no Path objects; only ``diff_snapshot`` converts
+    the few changed entries.
+    """
+    # One scandir per parent directory; DirEntry.stat() reuses the directory read where it can.
+    snapshot: Dict[str, Optional[tuple[int, int]]] = {}
+    for parent, names in by_parent.items():
+        parent_str = os.fspath(parent)
+        try:
+            with os.scandir(parent_str) as entries:
+                for entry in entries:
+                    if entry.name in names:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        for name in names:
+            snapshot.setdefault(os.path.join(parent_str, name), None)
+    return snapshot
+
+
+def diff_snapshot(
+    old: Mapping[str, Optional[tuple[int, int]]], new: Mapping[str, Optional[tuple[int, int]]]
+) -> List[Path]:
+    changed = {path for path, mtime in new.items() if old.get(path) != mtime}
+    changed.update(old.keys() - new.keys())
+    return sorted(Path(path) for path in changed)
+
+
+def wait_for_stable_snapshot(
+    by_parent: Mapping[Path, Set[str]],
+    current: Dict[str, Optional[tuple[int, int]]],
+    debounce_ms: int,
+) -> Dict[str, Optional[tuple[int, int]]]:
+    """Re-snapshot until nothing changed for ``debounce_ms`` so bulk copies trigger one rebuild."""
+    while debounce_ms > 0:
+        time.sleep(debounce_ms / 1000)
+        settled = collect_snapshot(by_parent)
+        if settled == current:
+            break
+        current = settled
+    return current
+
+
+def _watchdog_events(
+    watch_dirs: Iterable[Path], watch_filter: Callable[[object, str], bool], debounce_ms: int
+) -> Iterator[List[Path]]:
+    events: "queue.Queue[str]" = queue.Queue()
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, event) -> None:
+            if event.is_directory:
+                return
+            for raw_path in (event.src_path, getattr(event, "dest_path", "")):
+                path = os.fsdecode(raw_path)
+                if path and watch_filter(event.event_type, path):
+                    events.put(path)
+
+    observer = Observer()
+    handler = _Handler()
+    for directory in watch_dirs:
+        observer.schedule(handler, str(directory), recursive=True)
+    observer.start()
+    try:
+        while True:
+            batch = {events.get()}
+            # Keep collecting until nothing new arrived for the debounce window.
+            while True:
+                try:
+                    batch.add(events.get(timeout=debounce_ms / 1000))
+                except queue.Empty:
+                    break
+            yield sorted(Path(path) for path in batch)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _polling_events(
+    watch_paths: Iterable[Path], interval: float, debounce_ms: int
+) -> Iterator[List[Path]]:
+    # The watched set is fixed for this source, so group it by directory once, not every tick.
+    by_parent = group_by_parent(watch_paths)
+    snapshot = collect_snapshot(by_parent)
+    while True:
+        time.sleep(max(interval, 0.1))
+        current = collect_snapshot(by_parent)
+        if current != snapshot:
+            current = wait_for_stable_snapshot(by_parent, current, debounce_ms)
+            yield diff_snapshot(snapshot, current)
+            snapshot = current
+
+
+def has_native_events() -> bool:
+    """True when watchfiles or watchdog is installed, so ``event_source`` does not poll."""
+    return watchfiles_watch is not None or Observer is not None
+
+
+def event_source(
+    watch_paths: Set[Path],
+    input_paths: Set[Path],
+    extensions: AbstractSet[str],
+    interval: float,
+    debounce_ms: int,
+) -> Iterator[List[Path]]:
+    """Yield batches of changed paths from the best available backend.
+
+    watchfiles and watchdog both sit on the platform's native notifications (inotify,
+    kqueue, FSEvents, ReadDirectoryChangesW); without either, the watched paths are polled.
+    """
+    watch_dirs = watch_roots(watch_paths)
+    watch_filter = make_watch_filter(input_paths, extensions)
+    if watchfiles_watch is not None and watch_dirs:
+        # watchfiles groups every event seen within the debounce window into one batch.
+        for changes in watchfiles_watch(
+            *(str(path) for path in watch_dirs),
+            watch_filter=watch_filter,
+            debounce=debounce_ms,
+            step=50,
+        ):
+            yield sorted({Path(p) for _change, p in changes})
+    elif Observer is not None and watch_dirs:
+        yield from _watchdog_events(watch_dirs, watch_filter, debounce_ms)
+    else:
+        yield from _polling_events(watch_paths, interval, debounce_ms)
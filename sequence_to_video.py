@@ -6,16 +6,18 @@ from __future__ import annotations
 import argparse
 import copy
 import json
+import os
 import re
 import shutil
 import subprocess
 import tempfile
 from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Optional, Sequence, Tuple
 
 import incremental_builder as ib
-from lib import text_renderer
+from lib import concat, text_renderer
 from lib.motion import EFFECT_SEQUENCE, MotionPlan, build_motion_filter, select_motion
 from lib.text_utils import TextLayout, combine_overlay_texts, load_text_layout
 
@@ -35,6 +37,8 @@ DEFAULT_CONFIG = {
     "audio_files": [],
     "work_dir": "segments",
     "keep_temp": False,
+    "encoder": "auto",
+    "preset": "veryfast",
     "transitions": {
         "enabled": False,
         "motions": list(EFFECT_SEQUENCE),
@@ -48,6 +52,7 @@ IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".heic", ".heif"}
 AUDIO_EXTENSIONS = {".mp3", ".m4a", ".aac", ".wav", ".flac", ".ogg"}
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".m4v", ".avi", ".mkv", ".hevc", ".mpg", ".mpeg", ".wmv"}
 TEXT_EXTENSIONS = {".txt", ".pug"}
+YEAR_PATTERN = re.compile(r"(19|20)\d{2}")
 
 VERBOSE = False
 LABEL_YEAR = False
@@ -57,6 +62,25 @@ FFMPEG_DEBUG = False
 CROSSFADE_SECONDS = 1.0
 MOTION_ENABLED = False
 MOTION_EFFECTS: List[str] = []
+FFMPEG_THREADS: Optional[int] = None  # per-encode thread cap when segments render in parallel
+VIDEO_ENCODER = "libx264"
+
+# Output arguments per encoder; hardware entries are tried in this order by "auto".
+ENCODER_ARGS = {
+    "nvenc": [
+        "-c:v", "h264_nvenc", "-preset", "p4", "-tune", "hq", "-rc", "vbr", "-cq", "23",
+        "-pix_fmt", "yuv420p",
+    ],
+    "qsv": ["-c:v", "h264_qsv", "-global_quality", "23", "-pix_fmt", "nv12"],
+    "videotoolbox": ["-c:v", "h264_videotoolbox", "-q:v", "65", "-pix_fmt", "yuv420p"],
+    "libx264": ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+}
+ENCODER_CHOICES = ("auto", *ENCODER_ARGS)
+X264_PRESET = "veryfast"
+# ffprobe durations by (path, mtime_ns, size), so watch rebuilds do not re-probe unchanged files.
+_DURATION_CACHE: dict[tuple[str, int, int], Optional[float]] = {}
+
+
 def load_config(path: Path) -> dict[str, object]:
     config = copy.deepcopy(DEFAULT_CONFIG)
     if not path.exists():
@@ -280,6 +304,8 @@ def parse_args(config: dict[str, object]) -> argparse.Namespace:
         config, "debug_filename", DEFAULT_CONFIG["debug_filename"]
     )
     default_keep_temp = _config_bool(config, "keep_temp", False)
+    default_encoder = _config_str(config, "encoder", DEFAULT_CONFIG["encoder"])
+    default_preset = _config_str(config, "preset", DEFAULT_CONFIG["preset"])
     config_audio_list = _config_list(config, "audio_files")
     audio_default_desc = (
         ", ".join(config_audio_list) if config_audio_list else "none"
@@ -430,6 +456,17 @@ def parse_args(config: dict[str, object]) -> argparse.Namespace:
         action="store_true",
         help="Print each ffmpeg command before execution (implies --verbose).",
     )
+    parser.add_argument(
+        "--encoder",
+        choices=ENCODER_CHOICES,
+        default=default_encoder if default_encoder in ENCODER_CHOICES else "auto",
+        help="H.264 encoder for segments; auto picks NVENC/QSV/VideoToolbox when usable (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--preset",
+        default=default_preset,
+        help="libx264 preset for video clips; still slides always use ultrafast (default: %(default)s).",
+    )
     parser.add_argument(
         "--label-year",
         action="store_true",
@@ -500,6 +537,9 @@ def main() -> None:
     ffprobe_path = shutil.which("ffprobe")
     if not ffprobe_path:
         print("Warning: ffprobe not found; precise video durations may be unavailable.")
+    configure_encoder(args.encoder, ffmpeg_path)
+    global X264_PRESET
+    X264_PRESET = args.preset
 
     width, height = parse_resolution(args.resolution)
 
@@ -507,7 +547,9 @@ def main() -> None:
     if not source_dir.exists() or not source_dir.is_dir():
         raise SystemExit(f"Source directory {source_dir} does not exist or is not a directory")
 
-    media_files = sorted(p for p in source_dir.iterdir() if p.is_file())
+    with os.scandir(source_dir) as entries:
+        media_names = sorted(entry.name for entry in entries if entry.is_file())
+    media_files = [source_dir / name for name in media_names]
     total_media = len(media_files)
 
     if total_media == 0:
@@ -738,60 +780,77 @@ def render_slideshow(
         target_index = segment_index_by_prefix.get(audio_prefix, len(rendered_segments))
         audio_markers.append(AudioMarker(path=audio_path, segment_index=target_index))
 
-    concat_entries = [f"file '{segment.output.as_posix()}'" for segment in rendered_segments]
     concat_path = segments_dir / "concat.txt"
-    concat_path.write_text("\n".join(concat_entries), encoding="utf-8")
-
-    run_ffmpeg(
-        [
+    if resolved_audio_paths and not audio_markers:
+        # No timeline cues: join the segments and attach the tracks in one ffmpeg pass rather
+        # than writing the silent video first and remuxing it.
+        ib.concat_and_mux(
+            [segment.output for segment in rendered_segments],
+            output_path,
+            segments_dir,
+            resolved_audio_paths,
             ffmpeg_path,
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(concat_path),
-            "-c",
-            "copy",
-            str(output_path),
-        ]
-    )
-    print(f"Created {output_path}")
+            ffprobe_path,
+            concat_tool="ffmpeg",
+        )
+        print(f"Created {output_path}")
+        attached = sum(1 for path in resolved_audio_paths if path.exists())
+        if attached:
+            print(f"Attached audio from {attached} file(s).")
+    else:
+        concat_path = concat.write_concat_list(
+            [segment.output for segment in rendered_segments], segments_dir
+        )
+        run_ffmpeg(
+            [
+                ffmpeg_path,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_path),
+                "-c",
+                "copy",
+                str(output_path),
+            ]
+        )
+        print(f"Created {output_path}")
 
-    video_duration = probe_media_duration(ffprobe_path, output_path)
+        video_duration = probe_media_duration(ffprobe_path, output_path)
 
-    if audio_markers:
-        if ffprobe_path is None:
-            print(
-                "Warning: audio cues detected but ffprobe is unavailable; skipping timeline audio."
-            )
-            audio_entries: Sequence[AudioTimelineEntry] = []
+        if audio_markers:
+            if ffprobe_path is None:
+                print(
+                    "Warning: audio cues detected but ffprobe is unavailable; skipping timeline audio."
+                )
+                audio_entries: Sequence[AudioTimelineEntry] = []
+            else:
+                segment_durations = ensure_segment_durations(ffprobe_path, rendered_segments)
+                audio_entries = build_audio_timeline(audio_markers, segment_durations)
         else:
-            segment_durations = ensure_segment_durations(ffprobe_path, rendered_segments)
-            audio_entries = build_audio_timeline(audio_markers, segment_durations)
-    else:
-        audio_entries = []
+            audio_entries = []
 
-    if audio_entries:
-        audio_output_path = output_path.with_name(f"{output_path.stem}_audio.mp3")
-        create_timeline_audio(ffmpeg_path, audio_entries, audio_output_path, video_duration)
-        final_output_path = output_path.with_name(
-            f"{output_path.stem}_with_audio{output_path.suffix}"
-        )
-        mux_video_with_audio(ffmpeg_path, output_path, audio_output_path, final_output_path)
-        print(f"Created {final_output_path}")
-    elif resolved_audio_paths:
-        apply_audio_track(
-            ffmpeg_path,
-            output_path,
-            resolved_audio_paths,
-            ffprobe_path,
-            video_duration,
-        )
+        if audio_entries:
+            audio_output_path = output_path.with_name(f"{output_path.stem}_audio.mp3")
+            create_timeline_audio(ffmpeg_path, audio_entries, audio_output_path, video_duration)
+            final_output_path = output_path.with_name(
+                f"{output_path.stem}_with_audio{output_path.suffix}"
+            )
+            mux_video_with_audio(ffmpeg_path, output_path, audio_output_path, final_output_path)
+            print(f"Created {final_output_path}")
+        elif resolved_audio_paths:
+            apply_audio_track(
+                ffmpeg_path,
+                output_path,
+                resolved_audio_paths,
+                ffprobe_path,
+                video_duration,
+            )
 
     if not args.keep_temp:
         for path in new_segment_paths:
@@ -848,12 +907,45 @@ def build_media_filter_graph(
     debug_text: Optional[str],
     overlay_subtitle: Optional[Path] = None,
     motion: Optional[MotionPlan] = None,
+    input_label: str = "0:v",
+    label_prefix: str = "v",
+) -> tuple[str, str]:
+    # Slides mostly share these inputs, so the graph text is cached; the module-level font
+    # settings it reads are passed along so a config change still yields a fresh graph.
+    return _media_filter_graph(
+        width,
+        height,
+        overlay_text,
+        label_text,
+        debug_text,
+        overlay_subtitle,
+        motion,
+        input_label,
+        label_prefix,
+        FONT_PATH,
+        text_renderer.BODY_FONT_SIZE,
+    )
+
+
+@lru_cache(maxsize=512)
+def _media_filter_graph(
+    width: int,
+    height: int,
+    overlay_text: Optional[str],
+    label_text: Optional[str],
+    debug_text: Optional[str],
+    overlay_subtitle: Optional[Path],
+    motion: Optional[MotionPlan],
+    input_label: str,
+    label_prefix: str,
+    font_path: Optional[Path],
+    body_font_size: int,
 ) -> tuple[str, str]:
     label_counter = 0
 
     def next_label() -> str:
         nonlocal label_counter
-        label_name = f"v{label_counter}"
+        label_name = f"{label_prefix}{label_counter}"
         label_counter += 1
         return label_name
 
@@ -864,7 +956,7 @@ def build_media_filter_graph(
         f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
         "format=yuv420p",
     ]
-    steps.append(f"[0:v]{','.join(base_filters)}[{current}]")
+    steps.append(f"[{input_label}]{','.join(base_filters)}[{current}]")
 
     def append_filter(filter_expr: str) -> None:
         nonlocal current
@@ -877,21 +969,19 @@ def build_media_filter_graph(
         if motion_filter:
             append_filter(motion_filter)
 
-    body_font_size = text_renderer.BODY_FONT_SIZE
-    title_font_size = text_renderer.TITLE_FONT_SIZE
     label_font_size = max(24, int(body_font_size * 0.9))
     debug_font_size = max(18, int(body_font_size * 0.6))
 
     if overlay_subtitle:
         subtitle_path = escape_subtitle_path(overlay_subtitle)
         subtitle_filter = f"subtitles='{subtitle_path}'"
-        if FONT_PATH:
-            fonts_dir = escape_subtitle_path(FONT_PATH.parent)
+        if font_path:
+            fonts_dir = escape_subtitle_path(font_path.parent)
             subtitle_filter += f":fontsdir='{fonts_dir}'"
         append_filter(subtitle_filter)
     elif overlay_text:
         overlay_font_clause = (
-            f"fontfile='{escape_drawtext(FONT_PATH.as_posix())}':" if FONT_PATH else ""
+            f"fontfile='{escape_drawtext(font_path.as_posix())}':" if font_path else ""
         )
         overlay_value = escape_drawtext(overlay_text)
         append_filter(
@@ -902,7 +992,7 @@ def build_media_filter_graph(
 
     if label_text:
         font_clause = (
-            f"fontfile='{escape_drawtext(FONT_PATH.as_posix())}':" if FONT_PATH else ""
+            f"fontfile='{escape_drawtext(font_path.as_posix())}':" if font_path else ""
         )
         label_value = escape_drawtext(label_text)
         append_filter(
@@ -912,7 +1002,7 @@ def build_media_filter_graph(
 
     if debug_text:
         debug_font_clause = (
-            f"fontfile='{escape_drawtext(FONT_PATH.as_posix())}':" if FONT_PATH else ""
+            f"fontfile='{escape_drawtext(font_path.as_posix())}':" if font_path else ""
         )
         debug_value = escape_drawtext(debug_text)
         append_filter(
@@ -1044,6 +1134,67 @@ def build_text_filter_graph(
     return filter_graph, current
 
 
+@lru_cache(maxsize=None)
+def detect_hw_encoder(ffmpeg_path: str) -> Optional[str]:
+    """Return the first hardware H.264 encoder that ffmpeg lists and can actually open."""
+    try:
+        listing = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-encoders"], capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return None
+    for name, args in ENCODER_ARGS.items():
+        if name == "libx264" or f" {args[1]} " not in listing:
+            continue
+        # Builds often list encoders whose device is missing, so try a one-frame encode.
+        probe = subprocess.run(
+            [
+                ffmpeg_path,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "color=black:size=256x256:duration=0.1",
+                "-frames:v",
+                "1",
+                *args,
+                "-f",
+                "null",
+                "-",
+            ],
+            capture_output=True,
+        )
+        if probe.returncode == 0:
+            return name
+    return None
+
+
+def configure_encoder(choice: str, ffmpeg_path: str) -> str:
+    global VIDEO_ENCODER
+    if choice == "auto":
+        VIDEO_ENCODER = detect_hw_encoder(ffmpeg_path) or "libx264"
+    else:
+        VIDEO_ENCODER = choice if choice in ENCODER_ARGS else "libx264"
+    return VIDEO_ENCODER
+
+
+def video_encoder_args(preset: Optional[str] = None, tune: Optional[str] = None) -> List[str]:
+    args = list(ENCODER_ARGS[VIDEO_ENCODER])
+    if VIDEO_ENCODER == "libx264":
+        args.extend(["-preset", preset or X264_PRESET])
+        if tune:
+            args.extend(["-tune", tune])
+    return args
+
+
+def encoder_thread_args() -> List[str]:
+    if FFMPEG_THREADS is None:
+        return []
+    return ["-threads", str(FFMPEG_THREADS)]
+
+
 def run_ffmpeg(cmd: Iterable[str]) -> None:
     args_list = list(cmd)
     if FFMPEG_DEBUG:
@@ -1056,6 +1207,34 @@ def run_ffmpeg(cmd: Iterable[str]) -> None:
         print(result.stdout.strip())
 
 
+def run_ffmpeg_pipe(producer: Iterable[str], consumer: Iterable[str]) -> None:
+    """Run ``producer | consumer``: the consumer reads the producer's stdout as ``pipe:0``."""
+    producer_args = list(producer)
+    consumer_args = list(consumer)
+    if FFMPEG_DEBUG:
+        print("Running:", " ".join(producer_args), "|", " ".join(consumer_args))
+    # The producer's stderr goes to a file so a chatty encoder cannot block on a full pipe.
+    with tempfile.TemporaryFile() as producer_log:
+        upstream = subprocess.Popen(
+            producer_args, stdout=subprocess.PIPE, stderr=None if VERBOSE else producer_log
+        )
+        try:
+            result = subprocess.run(
+                consumer_args, stdin=upstream.stdout, capture_output=not VERBOSE, text=True
+            )
+        finally:
+            upstream.stdout.close()
+            upstream_code = upstream.wait()
+        if result.returncode != 0:
+            output = result.stderr.strip() or result.stdout.strip() or "ffmpeg command failed"
+            raise FFMpegError(output)
+        producer_log.seek(0)
+        output = producer_log.read().decode(errors="replace").strip()
+    # A consumer that stops early (e.g. -shortest) leaves the producer with a broken pipe.
+    if upstream_code != 0 and "Broken pipe" not in output:
+        raise FFMpegError(output or "ffmpeg command failed")
+
+
 def _probe_durations(paths: Sequence[Path], ffprobe_path: Optional[str]) -> list[Optional[float]]:
     durations: list[Optional[float]] = []
     for path in paths:
@@ -1173,59 +1352,27 @@ def apply_audio_track(
             tmp_dir_path,
         )
 
-        if len(adjusted_sources) == 1:
-            run_ffmpeg(
-                [
-                    ffmpeg_path,
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-y",
-                    "-i",
-                    str(adjusted_sources[0]),
-                    "-c:a",
-                    "aac",
-                    "-ac",
-                    "2",
-                    "-ar",
-                    "48000",
-                    str(combined_audio),
-                ]
-            )
-        else:
-            concat_cmd: List[str] = [
-                ffmpeg_path,
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-y",
-            ]
-            for source in adjusted_sources:
-                concat_cmd.extend(["-i", str(source)])
+        audio_cmd: List[str] = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+        ]
+        for source in adjusted_sources:
+            audio_cmd.extend(["-i", str(source)])
+        if len(adjusted_sources) > 1:
             filter_inputs = "".join(f"[{idx}:a]" for idx in range(len(adjusted_sources)))
             filter_complex = (
                 f"{filter_inputs}concat=n={len(adjusted_sources)}:v=0:a=1[aout]"
             )
-            concat_cmd.extend(
-                [
-                    "-filter_complex",
-                    filter_complex,
-                    "-map",
-                    "[aout]",
-                    "-c:a",
-                    "aac",
-                    "-ac",
-                    "2",
-                    "-ar",
-                    "48000",
-                    str(combined_audio),
-                ]
-            )
-            run_ffmpeg(concat_cmd)
+            audio_cmd.extend(["-filter_complex", filter_complex, "-map", "[aout]"])
+        audio_cmd.extend(["-c:a", "aac", "-ac", "2", "-ar", "48000"])
 
         tmp_video = tmp_dir_path / "with_audio.mp4"
-        run_ffmpeg(
-            [
+
+        def mux_cmd(audio_input: List[str], audio_codec: str) -> List[str]:
+            return [
                 ffmpeg_path,
                 "-hide_banner",
                 "-loglevel",
@@ -1233,8 +1380,7 @@ def apply_audio_track(
                 "-y",
                 "-i",
                 str(video_path),
-                "-i",
-                str(combined_audio),
+                *audio_input,
                 "-map",
                 "0:v:0",
                 "-map",
@@ -1242,17 +1388,31 @@ def apply_audio_track(
                 "-c:v",
                 "copy",
                 "-c:a",
-                "aac",
+                audio_codec,
                 "-shortest",
                 str(tmp_video),
             ]
-        )
+
+        try:
+            # Stream the encoded audio straight into the mux rather than through a temp file.
+            run_ffmpeg_pipe(
+                [*audio_cmd, "-f", "adts", "pipe:1"],
+                mux_cmd(["-f", "aac", "-i", "pipe:0"], "copy"),
+            )
+        except (FFMpegError, OSError):
+            run_ffmpeg([*audio_cmd, str(combined_audio)])
+            run_ffmpeg(mux_cmd(["-i", str(combined_audio)], "aac"))
         shutil.move(str(tmp_video), str(video_path))
     print(f"Attached audio from {len(existing_sources)} file(s).")
 
 
 def infer_year_text(source: Path) -> Optional[str]:
-    match = re.search(r"(19|20)\d{2}", source.stem)
+    return _year_in_stem(source.stem)
+
+
+@lru_cache(maxsize=4096)
+def _year_in_stem(stem: str) -> Optional[str]:
+    match = YEAR_PATTERN.search(stem)
     if match:
         return match.group(0)
     return None
@@ -1273,6 +1433,17 @@ def escape_subtitle_path(path: Path) -> str:
 def probe_media_duration(ffprobe_path: Optional[str], media_path: Path) -> Optional[float]:
     if not ffprobe_path:
         return None
+    try:
+        stat = media_path.stat()
+    except OSError:
+        return None
+    key = (str(media_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _DURATION_CACHE:
+        _DURATION_CACHE[key] = _probe_duration(ffprobe_path, media_path)
+    return _DURATION_CACHE[key]
+
+
+def _probe_duration(ffprobe_path: str, media_path: Path) -> Optional[float]:
     try:
         result = subprocess.run(
             [
@@ -1492,6 +1663,7 @@ def build_text_segment_cmd(
     height: int,
     fps: int,
     debug_text: Optional[str] = None,
+    preset: Optional[str] = "ultrafast",
 ) -> List[str]:
     base_color = f"color=color=0x101010:size={width}x{height}"
     filter_graph, filter_output = build_text_filter_graph(
@@ -1525,10 +1697,7 @@ def build_text_segment_cmd(
         f"[{filter_output}]",
         "-map",
         "1:a:0",
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
+        *video_encoder_args(preset, "stillimage"),
         "-r",
         str(fps),
         "-c:a",
@@ -1537,6 +1706,7 @@ def build_text_segment_cmd(
         "192k",
         "-movflags",
         "+faststart",
+        *encoder_thread_args(),
         str(output),
     ]
 
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from lib.concat import missing_segments, write_concat_list
+
+
+def test_write_concat_list_escapes_single_quotes(tmp_path: Path) -> None:
+    segments = [tmp_path / "0001_plain.mp4", tmp_path / "0002_Dad's 60th.mp4"]
+    concat_path = write_concat_list(segments, tmp_path)
+    assert concat_path == tmp_path / "concat.txt"
+    lines = concat_path.read_text(encoding="utf-8").splitlines()
+    assert lines == [
+        f"file '{tmp_path.as_posix()}/0001_plain.mp4'",
+        f"file '{tmp_path.as_posix()}/0002_Dad'\\''s 60th.mp4'",
+    ]
+
+
+def test_write_concat_list_keeps_non_ascii_names(tmp_path: Path) -> None:
+    concat_path = write_concat_list([tmp_path / "סבתא.mp4"], tmp_path, "prefix.txt")
+    assert concat_path.name == "prefix.txt"
+    assert concat_path.read_bytes().decode("utf-8").endswith("/סבתא.mp4'\n")
+
+
+def test_missing_segments_reports_only_absent_files(tmp_path: Path) -> None:
+    present = tmp_path / "0001.mp4"
+    present.write_bytes(b"")
+    absent = tmp_path / "0002.mp4"
+    assert missing_segments([present, absent, tmp_path / "gone" / "0003.mp4"]) == [
+        absent,
+        tmp_path / "gone" / "0003.mp4",
+    ]
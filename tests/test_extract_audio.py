@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from extract_audio import build_batch_cmd, load_clips
+
+
+def _write_spec(tmp_path: Path, entries: object) -> Path:
+    spec = tmp_path / "clips.json"
+    spec.write_text(json.dumps(entries), encoding="utf-8")
+    return spec
+
+
+def test_load_clips_shifts_every_start_by_the_offset(tmp_path: Path) -> None:
+    spec = _write_spec(
+        tmp_path,
+        [
+            {"start": 5, "duration": 2.5, "output": "a.mp3"},
+            {"output": "b.mp3"},
+        ],
+    )
+    assert load_clips(spec, 30.0) == [
+        (35.0, 2.5, Path("a.mp3")),
+        (30.0, None, Path("b.mp3")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        [],
+        [{"start": 1}],
+        [{"start": "soon", "output": "a.mp3"}],
+        [{"start": -1, "output": "a.mp3"}],
+        [{"duration": 0, "output": "a.mp3"}],
+    ],
+)
+def test_load_clips_rejects_bad_specs(tmp_path: Path, entries: object) -> None:
+    with pytest.raises(SystemExit):
+        load_clips(_write_spec(tmp_path, entries), 0.0)
+
+
+def test_build_batch_cmd_seeks_each_output_after_a_single_input() -> None:
+    cmd = build_batch_cmd(
+        "ffmpeg",
+        Path("in.mp4"),
+        [(1.0, 2.0, Path("a.wav")), (10.0, None, Path("b.wav"))],
+        "wav",
+        overwrite=False,
+    )
+    assert cmd.count("-i") == 1
+    assert cmd[:7] == ["ffmpeg", "-hide_banner", "-loglevel", "error", "-n", "-i", "in.mp4"]
+    first = cmd.index("a.wav")
+    second = cmd.index("b.wav")
+    assert cmd[7:11] == ["-ss", "1.0", "-t", "2.0"]
+    assert cmd[first + 1 : first + 3] == ["-ss", "10.0"]
+    assert "-t" not in cmd[first + 1 : second]
+    assert cmd[first - 7 : first] == ["-vn", "-acodec", "pcm_s16le", "-ar", "44100", "-ac", "2"]
@@ -0,0 +1,73 @@
+import os
+import random
+from pathlib import Path
+
+import find_duplicates
+from find_duplicates import (
+    build_similar_groups,
+    candidate_pairs,
+    hamming_distance,
+    iter_files,
+    pairs_within,
+)
+
+
+def test_iter_files_skips_linked_directories_unless_following(tmp_path: Path) -> None:
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "inside.jpg").write_bytes(b"abc")
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "photo.jpg").write_bytes(b"12345")
+    os.symlink(target, root / "link", target_is_directory=True)
+
+    assert sorted(iter_files(root)) == [(root / "photo.jpg", 5)]
+    assert sorted(iter_files(root, follow_links=True)) == [
+        (root / "link" / "inside.jpg", 3),
+        (root / "photo.jpg", 5),
+    ]
+
+
+def _brute_force_pairs(hashes: list[int], threshold: int) -> set[tuple[int, int]]:
+    return {
+        (idx, jdx)
+        for idx in range(len(hashes))
+        for jdx in range(idx + 1, len(hashes))
+        if hamming_distance(hashes[idx], hashes[jdx]) <= threshold
+    }
+
+
+def test_candidate_pairs_cover_every_close_pair() -> None:
+    rng = random.Random(7)
+    base = [rng.getrandbits(64) for _ in range(40)]
+    # Near copies with a few flipped bits, so some pairs fall inside the threshold.
+    hashes = base + [
+        value ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for value in base[:20]
+    ]
+    for threshold in (0, 3, 10):
+        expected = _brute_force_pairs(hashes, threshold)
+        candidates = set(candidate_pairs(hashes, threshold))
+        assert expected <= candidates
+        assert len(candidates) == len(list(candidate_pairs(hashes, threshold)))
+
+
+def test_pairs_within_matches_brute_force_with_and_without_numpy(monkeypatch) -> None:
+    rng = random.Random(11)
+    hashes = [rng.getrandbits(16) for _ in range(60)]
+    expected = _brute_force_pairs(hashes, 5)
+    assert set(pairs_within(hashes, 5, 16)) == expected
+    monkeypatch.setattr(find_duplicates, "np", None)
+    assert set(pairs_within(hashes, 5, 16)) == expected
+
+
+def test_build_similar_groups_joins_chains_transitively() -> None:
+    # a-b and b-c are within two bits, a-c is not; all three still form one group.
+    images = [
+        (Path("a.jpg"), 0b0000),
+        (Path("b.jpg"), 0b0011),
+        (Path("c.jpg"), 0b1111),
+        (Path("d.jpg"), (1 << 40) - 1),
+    ]
+    groups = build_similar_groups(images, 2)
+    assert [sorted(path.name for path in group) for group in groups] == [["a.jpg", "b.jpg", "c.jpg"]]
+    assert build_similar_groups(images[:1], 2) == []
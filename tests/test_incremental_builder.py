@@ -0,0 +1,69 @@
+from typing import Optional
+
+import pytest
+
+from incremental_builder import can_stream_copy, x264_level
+
+
+def _info(**overrides: object) -> dict[str, object]:
+    info: dict[str, object] = {
+        "codec_name": "h264",
+        "profile": "High",
+        "level": 40,
+        "pix_fmt": "yuv420p",
+        "width": 1920,
+        "height": 1080,
+        "r_frame_rate": "30/1",
+        "sample_aspect_ratio": "1:1",
+        "audio_streams": [{"codec_name": "aac", "sample_rate": "48000", "channels": 2}],
+    }
+    info.update(overrides)
+    return info
+
+
+def test_x264_level_follows_frame_size_and_rate() -> None:
+    assert x264_level(1280, 720, 30) == 31
+    assert x264_level(1920, 1080, 30) == 40
+    assert x264_level(1920, 1080, 60) == 42
+
+
+def test_can_stream_copy_accepts_a_matching_clip() -> None:
+    assert can_stream_copy(_info(), 1920, 1080, 30)
+    assert can_stream_copy(_info(profile="Main", level=31, tags={"rotate": "0"}), 1920, 1080, 30)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"codec_name": "hevc"},
+        {"profile": "High 10"},
+        {"profile": "Baseline"},
+        {"level": 51},
+        {"level": None},
+        {"pix_fmt": "yuvj420p"},
+        {"width": 1280},
+        {"r_frame_rate": "30000/1001"},
+        {"sample_aspect_ratio": "4:3"},
+        {"tags": {"rotate": "90"}},
+        {"side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]},
+        {"audio_streams": []},
+        {"audio_streams": [{"codec_name": "aac", "sample_rate": "44100", "channels": 2}]},
+        {"audio_streams": [{"codec_name": "aac", "sample_rate": "48000", "channels": 1}]},
+        {"audio_streams": [{"codec_name": "mp3", "sample_rate": "48000", "channels": 2}]},
+        {
+            "audio_streams": [
+                {"codec_name": "aac", "sample_rate": "48000", "channels": 2},
+                {"codec_name": "aac", "sample_rate": "48000", "channels": 2},
+            ]
+        },
+    ],
+)
+def test_can_stream_copy_rejects_what_the_copy_join_cannot_take(
+    overrides: dict[str, object]
+) -> None:
+    assert not can_stream_copy(_info(**overrides), 1920, 1080, 30)
+
+
+@pytest.mark.parametrize("info", [None, {}])
+def test_can_stream_copy_needs_probe_results(info: Optional[dict[str, object]]) -> None:
+    assert not can_stream_copy(info, 1920, 1080, 30)
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from lib.versioning import _version_index, has_existing_output, next_versioned_path
+
+
+def test_version_index_parses_only_stem_dash_number_suffix() -> None:
+    assert _version_index("slideshow-001.mp4", "slideshow", ".mp4") == 1
+    assert _version_index("slideshow-120.mp4", "slideshow", ".mp4") == 120
+    assert _version_index("slideshow.mp4", "slideshow", ".mp4") is None
+    assert _version_index("slideshow-.mp4", "slideshow", ".mp4") is None
+    assert _version_index("slideshow-01a.mp4", "slideshow", ".mp4") is None
+    assert _version_index("slideshow-001.mkv", "slideshow", ".mp4") is None
+    assert _version_index("other-001.mp4", "slideshow", ".mp4") is None
+    # Non-ASCII digits pass str.isdigit() but are not version numbers.
+    assert _version_index("slideshow-١.mp4", "slideshow", ".mp4") is None
+
+
+def test_next_versioned_path_counts_up_through_the_sidecar(tmp_path: Path) -> None:
+    base = tmp_path / "out" / "slideshow.mp4"
+    first = next_versioned_path(base)
+    assert first == tmp_path / "out" / "slideshow-001.mp4"
+    first.write_bytes(b"")
+    assert next_versioned_path(base).name == "slideshow-002.mp4"
+    assert (tmp_path / "out" / ".slideshow.last_index").read_text(encoding="utf-8") == "2"
+
+
+def test_next_versioned_path_rescans_when_the_sidecar_is_stale_or_missing(tmp_path: Path) -> None:
+    base = tmp_path / "slideshow.mp4"
+    for index in (1, 2, 7):
+        (tmp_path / f"slideshow-{index:03d}.mp4").write_bytes(b"")
+    assert next_versioned_path(base).name == "slideshow-008.mp4"
+
+    # A sidecar whose next number is already taken (e.g. a file copied in) falls back to a scan.
+    (tmp_path / ".slideshow.last_index").write_text("1", encoding="utf-8")
+    assert next_versioned_path(base).name == "slideshow-008.mp4"
+
+    (tmp_path / ".slideshow.last_index").write_text("garbage", encoding="utf-8")
+    assert next_versioned_path(base).name == "slideshow-008.mp4"
+
+
+def test_has_existing_output_sees_plain_and_versioned_files(tmp_path: Path) -> None:
+    base = tmp_path / "slideshow.mp4"
+    assert not has_existing_output(base)
+    assert not has_existing_output(tmp_path / "missing" / "slideshow.mp4")
+    (tmp_path / "slideshow-004.mp4").write_bytes(b"")
+    assert has_existing_output(base)
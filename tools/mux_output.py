@@ -4,9 +4,10 @@
 from __future__ import annotations
 
 import argparse
-import re
+import os
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 
@@ -30,20 +31,36 @@ def run_ffmpeg(cmd: list[str]) -> None:
         raise SystemExit(output)
 
 
+def clone_file(source: Path, target: Path) -> None:
+    """Copy ``source`` as a copy-on-write clone where the filesystem supports it (btrfs, XFS, APFS)."""
+    if sys.platform.startswith("linux"):
+        clone_cmd = ["cp", "--reflink=auto", str(source), str(target)]
+    elif sys.platform == "darwin":
+        clone_cmd = ["cp", "-c", str(source), str(target)]
+    else:
+        clone_cmd = None
+    if clone_cmd:
+        try:
+            subprocess.run(clone_cmd, check=True, capture_output=True)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    shutil.copyfile(source, target)
+
+
 def next_versioned_path(base: Path) -> Path:
     parent = base.parent
-    stem = base.stem
-    pattern = re.compile(rf"^{re.escape(stem)}_(\d+)\.mp4$")
+    prefix = f"{base.stem}_"
     max_index = 0
-    for candidate in parent.glob(f"{stem}_*.mp4"):
-        match = pattern.match(candidate.name)
-        if match:
-            try:
-                value = int(match.group(1))
-            except ValueError:
+    with os.scandir(parent) as entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.startswith(prefix) and name.endswith(".mp4")):
                 continue
-            max_index = max(max_index, value)
-    return parent / f"{stem}_{max_index + 1:03d}.mp4"
+            middle = name[len(prefix) : -len(".mp4")]
+            if middle.isascii() and middle.isdigit():
+                max_index = max(max_index, int(middle))
+    return parent / f"{base.stem}_{max_index + 1:03d}.mp4"
 
 
 def main() -> None:
@@ -90,7 +107,7 @@ def main() -> None:
                 ]
             )
         else:
-            shutil.copyfile(video_path, tmp_output)
+            clone_file(video_path, tmp_output)
 
         shutil.move(tmp_output, final_output)
     finally:
@@ -98,7 +115,7 @@ def main() -> None:
             tmp_output.unlink(missing_ok=True)
 
     versioned_path = next_versioned_path(final_output)
-    shutil.copyfile(final_output, versioned_path)
+    clone_file(final_output, versioned_path)
     print(f"generated {final_output.name} ({versioned_path.name})")
 
 
@@ -4,6 +4,8 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import shutil
 import sys
 import tempfile
@@ -19,7 +21,8 @@ import sequence_to_video as stv
 from lib import collage, text_renderer
 from lib.text_utils import combine_overlay_texts
 
-
+# The encoder "auto" resolved to, kept beside the segments because make starts one process per segment.
+ENCODER_CACHE_NAME = "encoder.json"
 
 
 def parse_args() -> argparse.Namespace:
@@ -65,6 +68,25 @@ def configure_environment(config: dict[str, object], verbose: bool) -> None:
     text_renderer.set_font_sizes(title_font_size, body_font_size)
 
 
+def resolve_encoder(choice: str, ffmpeg_path: str, segments_dir: Path) -> str:
+    """Configure the encoder, probing for hardware only once per segments directory."""
+    if choice != "auto":
+        return stv.configure_encoder(choice, ffmpeg_path)
+    cache_path = segments_dir / ENCODER_CACHE_NAME
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["ffmpeg"] == ffmpeg_path and cached["encoder"] in stv.ENCODER_ARGS:
+            return stv.configure_encoder(cached["encoder"], ffmpeg_path)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    encoder = stv.configure_encoder("auto", ffmpeg_path)
+    # Parallel make jobs may all probe on the first run; each swaps in a whole file.
+    tmp_path = cache_path.with_name(f"{ENCODER_CACHE_NAME}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"ffmpeg": ffmpeg_path, "encoder": encoder}), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return encoder
+
+
 def ensure_mp4(path: Path) -> Path:
     if path.suffix:
         return path
@@ -120,6 +142,11 @@ def main() -> None:
 
     ffmpeg_path = shutil.which("ffmpeg") or "ffmpeg"
     ffprobe_path = shutil.which("ffprobe")
+    # Same encoder and preset as incremental_builder so `make` segments concat with stream copy.
+    resolve_encoder(
+        stv._config_str(config, "encoder", stv.DEFAULT_CONFIG["encoder"]), ffmpeg_path, segments_dir
+    )
+    stv.X264_PRESET = stv._config_str(config, "preset", stv.DEFAULT_CONFIG["preset"])
     width, height = stv.parse_resolution(str(config.get("resolution", "1920x1080")))
     fps = int(config.get("fps", stv.DEFAULT_CONFIG["fps"]))
 